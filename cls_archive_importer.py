@@ -0,0 +1,72 @@
+from cls_excel_handler import ClsExcelHandler
+from cls_statement_exporter import ClsStatementExporter
+from cls_statement_store import ClsStatementStore
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from typing import Tuple
+
+
+class ClsArchiveImporter():
+    def __init__(self, books_path: str, store: ClsStatementStore):
+        self.books_path = books_path
+        self._store = store
+        self._exporter = ClsStatementExporter(books_path)
+
+    def import_archive(self, process_count: int = None, batch_size: int = 200) -> int:
+        """
+        以多個行程唯讀開啟既有活頁簿,逐檔串流匯入資料庫
+
+        Keyword Arguments:
+        process_count -- 行程數量(None=CPU核心數) (default: None)
+        batch_size -- 每個交易寫入的活頁簿數量 (default: 200)
+
+        Returns:
+        匯入的表格數量
+        """
+        books = self._exporter.get_archive_books('')
+        book_arguments = [(book.stock_id, book.stock_name, book.table_type, book.book_path) for book in books]
+
+        table_count = 0
+        batch = list()
+        with ProcessPoolExecutor(max_workers=process_count) as executor:
+            for tables in executor.map(ClsArchiveImporter._read_book, book_arguments, chunksize=16):
+                batch.extend(tables)
+                if len(batch) >= batch_size:
+                    self._store.write_tables(batch)
+                    table_count += len(batch)
+                    batch = list()
+        if batch:
+            self._store.write_tables(batch)
+            table_count += len(batch)
+
+        return table_count
+
+    @staticmethod
+    def _read_book(book_argument: Tuple[str, str, str, str]) -> List[Tuple[str, str, str, str, List[list]]]:
+        """
+        唯讀讀取單一活頁簿(在子行程執行)
+
+        Arguments:
+        book_argument -- (股票代號,股票名稱,表格類型,本機路徑)
+
+        Returns:
+        (股票代號,股票名稱,表格類型,工作表名稱,表格內容)列表
+        """
+        stock_id, stock_name, table_type, book_path = book_argument
+        tables = list()
+
+        for sheet_name, rows in ClsExcelHandler().read_book_sheets(book_path):
+            if table_type == '基本資料':
+                sheet_name = ''
+            elif not ClsStatementExporter.sheet_name_pattern.match(sheet_name):
+                continue
+            records = list()
+            for row in rows:
+                record = list(row)
+                while record and record[-1] is None:
+                    record.pop()
+                if record:
+                    records.append(record)
+            tables.append((stock_id, stock_name, table_type, sheet_name, records))
+
+        return tables
@@ -0,0 +1,56 @@
+import unittest
+from cls_archive_importer import ClsArchiveImporter
+from cls_statement_store import ClsStatementStore
+from cls_excel_handler import ClsExcelHandler
+import tempfile
+import shutil
+import os
+
+
+class ClsArchiveImporterTest(unittest.TestCase):
+    books_path = tempfile.gettempdir() + '\\archive_importer_test'
+    excel_handler = ClsExcelHandler()
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        if os.path.isdir(self.books_path):
+            shutil.rmtree(self.books_path)
+        self.excel_handler.open_books_directory(self.books_path)
+
+        book_path = self.books_path + '\\1101(台泥)_資產負債表.xlsx'
+        self.excel_handler.open_book(book_path)
+        self.excel_handler.open_sheet('2018_03')
+        self.excel_handler.write_to_sheet([['資產總額', '1,000', '100.00'], ['負債總額', '(200)', '20.00']])
+        self.excel_handler.save_book(book_path)
+
+        book_path = self.books_path + '\\1101(台泥)_基本資料.xlsx'
+        self.excel_handler.open_book(book_path)
+        self.excel_handler.write_to_sheet([['董事長', '張安平'], ['總經理', '李鐘培']])
+        self.excel_handler.save_book(book_path)
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        self.statement_store = ClsStatementStore(':memory:')
+
+    def tearDown(self):
+        self.statement_store.close()
+    # endregion
+
+    def test_import_archive(self):
+        archive_importer = ClsArchiveImporter(self.books_path, self.statement_store)
+        self.assertEqual(archive_importer.import_archive(2), 2)
+        self.assertEqual(self.statement_store.read_table('1101', '資產負債表', '2018_03'), [['資產總額', 1000.0, 100.0], ['負債總額', -200.0, 20.0]])
+        self.assertEqual(self.statement_store.read_table('1101', '基本資料', ''), [['董事長', '張安平'], ['總經理', '李鐘培']])
+
+
+if __name__ == '__main__':
+    tests = ['test_import_archive']
+    suite = unittest.TestSuite(map(ClsArchiveImporterTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
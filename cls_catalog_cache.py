@@ -0,0 +1,149 @@
+from cls_statement_store import ClsStatementStore
+from cls_webpage_fetcher import ClsWebpageFetcher
+import datetime
+import hashlib
+import json
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+
+class ClsCatalogCache():
+    def __init__(self, store: ClsStatementStore, fetcher: ClsWebpageFetcher = None, max_age_hours: float = 24, revalidate_timeout_seconds: float = 30):
+        """
+        Arguments:
+        store -- 資料庫(快照與表格資料存於同一資料庫,多個工作程序共用同一份快照)
+
+        Keyword Arguments:
+        fetcher -- 網頁下載物件 (default: ClsWebpageFetcher())
+        max_age_hours -- 快照超過幾小時才重新驗證 (default: 24)
+        revalidate_timeout_seconds -- 已有快照時重新驗證的逾時秒數(只嘗試1次,失敗立即沿用快照) (default: 30)
+        """
+        self._store = store
+        self._fetcher = fetcher or ClsWebpageFetcher()
+        self.max_age_hours = max_age_hours
+        self.revalidate_timeout_seconds = revalidate_timeout_seconds
+        self._store.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS catalogs (
+                catalog_name TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                last_modified TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                validated_at TEXT NOT NULL,
+                changed_at TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS catalog_history (
+                catalog_name TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                item_name TEXT NOT NULL,
+                event TEXT NOT NULL,
+                recorded_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS catalog_history_item ON catalog_history (catalog_name, item_key, recorded_at);
+            ''')
+
+    def get_catalog(self, catalog_name: str, url: str, parse: Callable[[str], List[List[str]]], refresh: bool = False) -> List[List[str]]:
+        """
+        取得參考目錄(股票列表/年度選項): 快照未過期直接使用;過期才以條件式下載重新驗證,
+        伺服器回應304或解析後雜湊值相同只更新驗證時間,內容不同才取代快照並記錄項目的增加/移除/更名;
+        下載失敗或解析結果為空白(ex: 維護頁面)時沿用舊快照,沒有快照則拋出例外
+        (已有快照時只嘗試下載1次,網站無法連線不會等待重試;沒有快照才等待重試)
+
+        Arguments:
+        catalog_name -- 目錄名稱
+        url -- 網址
+        parse -- 將網頁內容解析為[代號,名稱,...]列表的函式
+
+        Keyword Arguments:
+        refresh -- 不論是否過期都重新驗證 (default: False)
+
+        Returns:
+        目錄項目列表
+
+        Raises:
+        ValueError -- 沒有快照且解析結果為空白
+        """
+        row = self._store.connection.execute('SELECT etag, last_modified, content, validated_at FROM catalogs WHERE catalog_name = ?', (catalog_name,)).fetchone()
+        if row is not None and not refresh:
+            validated_at = datetime.datetime.fromisoformat(row[3])
+            if datetime.datetime.now() - validated_at < datetime.timedelta(hours=self.max_age_hours):
+                return json.loads(row[2])
+
+        try:
+            if row is None:
+                response = self._fetcher.download_conditional(url)
+            else:
+                response = self._fetcher.download_conditional(url, row[0], row[1], self.revalidate_timeout_seconds)
+        except Exception:
+            if row is None:
+                raise
+            return json.loads(row[2])
+
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        if row is not None and response.not_modified:
+            with self._store.connection:
+                self._store.connection.execute('UPDATE catalogs SET validated_at = ? WHERE catalog_name = ?', (now, catalog_name))
+            return json.loads(row[2])
+
+        items = parse(response.text)
+        if not items:
+            if row is None:
+                raise ValueError(catalog_name + '目錄解析結果為空白: ' + url)
+            return json.loads(row[2])
+
+        content = json.dumps(items, ensure_ascii=False, separators=(',', ':'))
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        self.record_catalog(catalog_name, url, response.etag, response.last_modified, content_hash, items, now)
+        return items
+
+    def record_catalog(self, catalog_name: str, url: str, etag: str, last_modified: str, content_hash: str, items: List[List[str]], now: str):
+        """
+        記錄重新驗證的結果(同一交易內比對最新快照,多個工作程序同時驗證也只記錄一次異動)
+
+        Arguments:
+        catalog_name -- 目錄名稱
+        url -- 網址
+        etag -- ETag
+        last_modified -- Last-Modified
+        content_hash -- 目錄內容雜湊值
+        items -- 目錄項目列表
+        now -- 驗證時間
+        """
+        connection = self._store.connection
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute('SELECT content_hash, content FROM catalogs WHERE catalog_name = ?', (catalog_name,)).fetchone()
+            if row is not None and row[0] == content_hash:
+                connection.execute('UPDATE catalogs SET etag = ?, last_modified = ?, validated_at = ? WHERE catalog_name = ?', (etag, last_modified, now, catalog_name))
+                return
+
+            if row is not None:
+                old_names = {item[0]: item[1] if len(item) > 1 else '' for item in json.loads(row[1])}
+                new_names = {item[0]: item[1] if len(item) > 1 else '' for item in items}
+                events = [(catalog_name, key, name, 'listed', now) for key, name in new_names.items() if key not in old_names]
+                events += [(catalog_name, key, name, 'delisted', now) for key, name in old_names.items() if key not in new_names]
+                events += [(catalog_name, key, name, 'renamed', now) for key, name in new_names.items() if key in old_names and old_names[key] != name]
+                connection.executemany('INSERT INTO catalog_history (catalog_name, item_key, item_name, event, recorded_at) VALUES (?, ?, ?, ?, ?)', events)
+
+            connection.execute('INSERT OR REPLACE INTO catalogs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (catalog_name, url, etag, last_modified, content_hash, json.dumps(items, ensure_ascii=False), now, now))
+
+    def get_history(self, catalog_name: str, item_key: str = '') -> List[Tuple[str, str, str, str]]:
+        """
+        取得目錄項目的增加/移除/更名記錄(舊到新;第1次建立快照不記錄)
+
+        Arguments:
+        catalog_name -- 目錄名稱
+
+        Keyword Arguments:
+        item_key -- 項目代號(空白=全部) (default: '')
+
+        Returns:
+        (記錄時間,項目代號,項目名稱,listed/delisted/renamed)列表
+        """
+        cursor = self._store.connection.execute('''
+            SELECT recorded_at, item_key, item_name, event FROM catalog_history
+            WHERE catalog_name = ? AND (? = '' OR item_key = ?)
+            ORDER BY recorded_at, rowid''', (catalog_name, item_key, item_key))
+        return cursor.fetchall()
@@ -0,0 +1,96 @@
+import unittest
+from cls_catalog_cache import ClsCatalogCache
+from cls_statement_store import ClsStatementStore
+import typing
+import re
+import tempfile
+import os
+
+
+class ClsCatalogCacheTest(unittest.TestCase):
+    database_path = tempfile.gettempdir() + os.sep + 'catalog_cache_test.db'
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.isfile(self.database_path + suffix):
+                os.remove(self.database_path + suffix)
+        self.statement_store = ClsStatementStore(self.database_path)
+        self.requests = list()
+        self.timeouts = list()
+        self.text = '1101 台泥,1102 亞泥'
+        self.catalog_cache = ClsCatalogCache(self.statement_store, self)
+
+    def tearDown(self):
+        self.statement_store.close()
+    # endregion
+
+    def download_conditional(self, url: str, etag: str = '', last_modified: str = '', timeout: float = None):
+        self.requests.append(etag)
+        self.timeouts.append(timeout)
+        response = typing.NamedTuple('response', [('not_modified', bool), ('text', str), ('etag', str), ('last_modified', str)])
+        response.not_modified = etag == self.text
+        response.text = self.text if not response.not_modified else ''
+        response.etag = self.text
+        response.last_modified = ''
+        return response
+
+    def _parse(self, text: str) -> typing.List[typing.List[str]]:
+        return [item.split(' ') for item in text.split(',')]
+
+    def _parse_stock_items(self, text: str) -> typing.List[typing.List[str]]:
+        return [item.split(' ') for item in text.split(',') if re.fullmatch(r'\d{4} \S+', item)]
+
+    def test_get_catalog(self):
+        self.assertEqual(self.catalog_cache.get_catalog('stocks', 'url', self._parse), [['1101', '台泥'], ['1102', '亞泥']])
+        self.assertEqual(self.catalog_cache.get_catalog('stocks', 'url', self._parse), [['1101', '台泥'], ['1102', '亞泥']])
+        self.assertEqual(self.requests, [''])
+
+        self.assertEqual(self.catalog_cache.get_catalog('stocks', 'url', self._parse, refresh=True), [['1101', '台泥'], ['1102', '亞泥']])
+        self.assertEqual(self.requests, ['', '1101 台泥,1102 亞泥'])
+        self.assertEqual(self.timeouts, [None, self.catalog_cache.revalidate_timeout_seconds])
+        self.assertEqual(self.catalog_cache.get_history('stocks'), [])
+
+    def test_get_history(self):
+        self.catalog_cache.get_catalog('stocks', 'url', self._parse)
+        self.text = '1101 台泥,1103 嘉泥,1102 亞洲水泥'
+        self.catalog_cache.get_catalog('stocks', 'url', self._parse, refresh=True)
+        self.text = '1101 台泥,1102 亞洲水泥'
+        self.catalog_cache.get_catalog('stocks', 'url', self._parse, refresh=True)
+
+        self.assertEqual([event[1:] for event in self.catalog_cache.get_history('stocks')], [('1103', '嘉泥', 'listed'), ('1102', '亞洲水泥', 'renamed'), ('1103', '嘉泥', 'delisted')])
+        self.assertEqual([event[1:] for event in self.catalog_cache.get_history('stocks', '1102')], [('1102', '亞洲水泥', 'renamed')])
+
+    def test_get_catalog_failed(self):
+        self.text = '<html>系統維護中</html>'
+        with self.assertRaises(ValueError):
+            self.catalog_cache.get_catalog('stocks', 'url', self._parse_stock_items)
+
+        self.text = '1101 台泥,1102 亞泥'
+        self.catalog_cache.get_catalog('stocks', 'url', self._parse_stock_items)
+        self.text = '<html>系統維護中</html>'
+        self.assertEqual(self.catalog_cache.get_catalog('stocks', 'url', self._parse_stock_items, refresh=True), [['1101', '台泥'], ['1102', '亞泥']])
+        self.assertEqual(self.catalog_cache.get_history('stocks'), [])
+
+        def download_conditional(url: str, etag: str = '', last_modified: str = '', timeout: float = None):
+            raise ConnectionError(url)
+        self.catalog_cache._fetcher = typing.NamedTuple('fetcher', [('download_conditional', typing.Callable)])
+        self.catalog_cache._fetcher.download_conditional = download_conditional
+        self.assertEqual(self.catalog_cache.get_catalog('stocks', 'url', self._parse_stock_items, refresh=True), [['1101', '台泥'], ['1102', '亞泥']])
+
+
+if __name__ == '__main__':
+    tests = ['test_get_catalog']
+    suite = unittest.TestSuite(map(ClsCatalogCacheTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
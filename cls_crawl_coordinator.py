@@ -0,0 +1,209 @@
+import sqlite3
+import time
+from typing import List
+from typing import NamedTuple
+
+
+class ClsCrawlCoordinator():
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+
+        connection = self._connect()
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS shards (
+                shard_id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL DEFAULT '',
+                start_stock_id TEXT NOT NULL,
+                finish_stock_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker_id TEXT,
+                lease_expire REAL,
+                heartbeat REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )''')
+        if 'run_id' not in [column[1] for column in connection.execute('PRAGMA table_info(shards)')]:
+            connection.execute("ALTER TABLE shards ADD COLUMN run_id TEXT NOT NULL DEFAULT ''")
+        connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        開啟資料庫連線(每個執行緒/行程各自開啟,交易以BEGIN IMMEDIATE鎖定)
+
+        Returns:
+        資料庫連線
+        """
+        return sqlite3.connect(self.database_path, timeout=60, isolation_level=None)
+
+    def create_shards(self, stock_ids: List[str], shard_size: int, run_id: str = '') -> int:
+        """
+        依股票代號切分本次執行的工作分片(同一執行代號已有分片則不重建;其他執行代號的分片只刪除已完成/待處理/租約已過期的,
+        前一次執行仍在處理中的分片保留到完成)
+        分片範圍為起始代號(含)~結束代號(不含)且首尾相接,第1個分片起始與最後1個分片結束為空白(無上下限),
+        建立分片後才上巿的股票也會落在某個分片
+
+        Arguments:
+        stock_ids -- 股票代號列表
+        shard_size -- 每個分片的股票數量
+
+        Keyword Arguments:
+        run_id -- 執行代號(ex: 每日排程使用日期) (default: '')
+
+        Returns:
+        分片數量
+        """
+        stock_ids = sorted(stock_ids)
+        now = time.time()
+
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            shard_count = connection.execute('SELECT COUNT(*) FROM shards WHERE run_id = ?', (run_id,)).fetchone()[0]
+            if shard_count == 0:
+                connection.execute('''
+                    DELETE FROM shards
+                    WHERE run_id != ? AND (status != 'running' OR lease_expire < ?)''', (run_id, now))
+                boundaries = [''] + stock_ids[shard_size::shard_size] + ['']
+                for start_stock_id, finish_stock_id in zip(boundaries, boundaries[1:]):
+                    connection.execute('INSERT INTO shards (run_id, start_stock_id, finish_stock_id) VALUES (?, ?, ?)', (run_id, start_stock_id, finish_stock_id))
+                    shard_count += 1
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+        return shard_count
+
+    def claim_shard(self, worker_id: str, lease_seconds: int, run_id: str = '') -> NamedTuple('shard', [('shard_id', int), ('start_stock_id', str), ('finish_stock_id', str)]):
+        """
+        認領本次執行一個待處理或租約已過期(工作程序已停止)的分片
+
+        Arguments:
+        worker_id -- 工作程序代號
+        lease_seconds -- 租約秒數
+
+        Keyword Arguments:
+        run_id -- 執行代號 (default: '')
+
+        Returns:
+        分片(無可認領分片則為None)
+        """
+        now = time.time()
+
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute('''
+                SELECT shard_id, start_stock_id, finish_stock_id FROM shards
+                WHERE run_id = ? AND (status = 'pending' OR (status = 'running' AND lease_expire < ?))
+                ORDER BY shard_id LIMIT 1''', (run_id, now)).fetchone()
+            if row is not None:
+                connection.execute('''
+                    UPDATE shards SET status = 'running', worker_id = ?, lease_expire = ?, heartbeat = ?, attempts = attempts + 1
+                    WHERE shard_id = ?''', (worker_id, now + lease_seconds, now, row[0]))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+        if row is None:
+            return None
+
+        shard = NamedTuple('shard', [('shard_id', int), ('start_stock_id', str), ('finish_stock_id', str)])
+        shard.shard_id = row[0]
+        shard.start_stock_id = row[1]
+        shard.finish_stock_id = row[2]
+        return shard
+
+    def is_in_shard(self, shard: NamedTuple('shard', [('shard_id', int), ('start_stock_id', str), ('finish_stock_id', str)]), stock_id: str) -> bool:
+        """
+        判斷股票代號是否在分片範圍內
+
+        Arguments:
+        shard -- 分片
+        stock_id -- 股票代號
+
+        Returns:
+        回傳結果
+        """
+        return shard.start_stock_id <= stock_id and (shard.finish_stock_id == '' or stock_id < shard.finish_stock_id)
+
+    def heartbeat(self, shard_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """
+        延長分片租約
+
+        Arguments:
+        shard_id -- 分片代號
+        worker_id -- 工作程序代號
+        lease_seconds -- 租約秒數
+
+        Returns:
+        是否仍持有租約(False=分片已被重新指派)
+        """
+        now = time.time()
+
+        connection = self._connect()
+        try:
+            cursor = connection.execute('''
+                UPDATE shards SET lease_expire = ?, heartbeat = ?
+                WHERE shard_id = ? AND worker_id = ? AND status = 'running' ''', (now + lease_seconds, now, shard_id, worker_id))
+            return cursor.rowcount == 1
+        finally:
+            connection.close()
+
+    def complete_shard(self, shard_id: int, worker_id: str) -> bool:
+        """
+        標記分片完成
+
+        Arguments:
+        shard_id -- 分片代號
+        worker_id -- 工作程序代號
+
+        Returns:
+        是否標記成功(False=分片已被重新指派)
+        """
+        connection = self._connect()
+        try:
+            cursor = connection.execute('''
+                UPDATE shards SET status = 'done', lease_expire = NULL
+                WHERE shard_id = ? AND worker_id = ? AND status = 'running' ''', (shard_id, worker_id))
+            return cursor.rowcount == 1
+        finally:
+            connection.close()
+
+    def get_progress(self, run_id: str = '') -> dict:
+        """
+        取得本次執行各狀態的分片數量
+
+        Keyword Arguments:
+        run_id -- 執行代號 (default: '')
+
+        Returns:
+        狀態/分片數量對照(pending/running/done)
+        """
+        progress = {'pending': 0, 'running': 0, 'done': 0}
+
+        connection = self._connect()
+        try:
+            for status, shard_count in connection.execute('SELECT status, COUNT(*) FROM shards WHERE run_id = ? GROUP BY status', (run_id,)):
+                progress[status] = shard_count
+        finally:
+            connection.close()
+
+        return progress
+
+    def is_finished(self, run_id: str = '') -> bool:
+        """
+        判斷本次執行所有分片是否都已完成
+
+        Keyword Arguments:
+        run_id -- 執行代號 (default: '')
+
+        Returns:
+        回傳結果
+        """
+        progress = self.get_progress(run_id)
+        return progress['pending'] == 0 and progress['running'] == 0
@@ -0,0 +1,90 @@
+import unittest
+from cls_crawl_coordinator import ClsCrawlCoordinator
+import tempfile
+import os
+
+
+class ClsCrawlCoordinatorTest(unittest.TestCase):
+    database_path = tempfile.gettempdir() + os.sep + 'crawl_coordinator_test.db'
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        if os.path.isfile(self.database_path):
+            os.remove(self.database_path)
+        self.coordinator = ClsCrawlCoordinator(self.database_path)
+
+    def tearDown(self):
+        pass
+    # endregion
+
+    def test_create_shards(self):
+        self.assertEqual(self.coordinator.create_shards(['1102', '1101', '1103', '2330', '2317'], 2, '2018-11-14'), 3)
+        self.assertEqual(self.coordinator.create_shards(['1101'], 2, '2018-11-14'), 3)
+
+        shards = [self.coordinator.claim_shard('worker-1', 60, '2018-11-14') for _ in range(3)]
+        self.assertEqual([(shard.start_stock_id, shard.finish_stock_id) for shard in shards], [('', '1103'), ('1103', '2330'), ('2330', '')])
+        self.assertTrue(self.coordinator.is_in_shard(shards[1], '1201'))
+        self.assertFalse(self.coordinator.is_in_shard(shards[1], '2330'))
+        self.assertTrue(self.coordinator.is_in_shard(shards[2], '9999'))
+
+        for shard in shards:
+            self.coordinator.complete_shard(shard.shard_id, 'worker-1')
+        self.assertTrue(self.coordinator.is_finished('2018-11-14'))
+        self.assertEqual(self.coordinator.create_shards(['1101'], 2, '2018-11-15'), 1)
+        self.assertFalse(self.coordinator.is_finished('2018-11-15'))
+
+    def test_create_shards_running(self):
+        self.coordinator.create_shards(['1101', '1102'], 1, '2018-11-14')
+        running_shard = self.coordinator.claim_shard('worker-1', 60, '2018-11-14')
+
+        self.coordinator.create_shards(['1101', '1102'], 1, '2018-11-15')
+        self.assertEqual(self.coordinator.get_progress('2018-11-14'), {'pending': 0, 'running': 1, 'done': 0})
+        self.assertTrue(self.coordinator.heartbeat(running_shard.shard_id, 'worker-1', 60))
+        self.assertTrue(self.coordinator.complete_shard(running_shard.shard_id, 'worker-1'))
+        self.assertIsNone(self.coordinator.claim_shard('worker-1', 60, '2018-11-14'))
+        self.assertTrue(self.coordinator.is_finished('2018-11-14'))
+
+        shards = [self.coordinator.claim_shard('worker-2', 60, '2018-11-15') for _ in range(2)]
+        self.assertEqual([(shard.start_stock_id, shard.finish_stock_id) for shard in shards], [('', '1102'), ('1102', '')])
+        self.assertEqual(self.coordinator.get_progress('2018-11-15'), {'pending': 0, 'running': 2, 'done': 0})
+
+    def test_claim_shard(self):
+        self.coordinator.create_shards(['1101', '1102'], 1)
+
+        first_shard = self.coordinator.claim_shard('worker-1', 60)
+        second_shard = self.coordinator.claim_shard('worker-2', 60)
+        self.assertNotEqual(first_shard.shard_id, second_shard.shard_id)
+        self.assertIsNone(self.coordinator.claim_shard('worker-3', 60))
+
+        self.assertTrue(self.coordinator.complete_shard(first_shard.shard_id, 'worker-1'))
+        self.assertTrue(self.coordinator.complete_shard(second_shard.shard_id, 'worker-2'))
+        self.assertTrue(self.coordinator.is_finished())
+
+    def test_reassign_dead_worker_shard(self):
+        self.coordinator.create_shards(['1101'], 1)
+
+        dead_shard = self.coordinator.claim_shard('worker-1', -1)
+        shard = self.coordinator.claim_shard('worker-2', 60)
+        self.assertEqual(dead_shard.shard_id, shard.shard_id)
+
+        self.assertFalse(self.coordinator.heartbeat(dead_shard.shard_id, 'worker-1', 60))
+        self.assertFalse(self.coordinator.complete_shard(dead_shard.shard_id, 'worker-1'))
+        self.assertTrue(self.coordinator.heartbeat(shard.shard_id, 'worker-2', 60))
+        self.assertEqual(self.coordinator.get_progress(), {'pending': 0, 'running': 1, 'done': 0})
+
+
+if __name__ == '__main__':
+    tests = ['test_claim_shard']
+    suite = unittest.TestSuite(map(ClsCrawlCoordinatorTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
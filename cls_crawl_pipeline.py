@@ -0,0 +1,189 @@
+from cls_excel_handler import ClsExcelHandler
+from cls_webpage_fetcher import ClsWebpageFetcher
+import queue
+import threading
+import time
+from typing import Callable
+from typing import List
+from typing import NamedTuple
+
+
+class ClsCrawlPipeline():
+    stage_names = ['plan', 'fetch', 'parse', 'normalize', 'write']
+
+    def __init__(self, taiwan_stock, buffer_size: int = 8, fetch_workers: int = 1, parse_workers: int = 2, normalize_workers: int = 1, wait_seconds: tuple = (30, 35)):
+        """
+        Arguments:
+        taiwan_stock -- ClsTaiwanStock物件(使用其排程器及工作的要求/下載/解析/正規化/儲存方法)
+
+        Keyword Arguments:
+        buffer_size -- 階段之間的佇列上限,佇列滿時上游階段暫停(避免下載速度超過寫入速度而佔用記憶體) (default: 8)
+        fetch_workers -- 下載執行緒數(對網站禮貌起見預設1) (default: 1)
+        parse_workers -- 解析執行緒數 (default: 2)
+        normalize_workers -- 正規化執行緒數 (default: 1)
+        wait_seconds -- 每個下載執行緒兩次下載之間暫停的(最少,最多)秒數 (default: (30, 35))
+        """
+        self._taiwan_stock = taiwan_stock
+        self.buffer_size = buffer_size
+        self.workers = {'plan': 1, 'fetch': fetch_workers, 'parse': parse_workers, 'normalize': normalize_workers, 'write': 1}
+        self.wait_seconds = wait_seconds
+        self._sentinel = object()
+        self._stop_event: threading.Event = None
+        self._cancel_event: threading.Event = None
+        self._deadline: float = None
+        self._errors = list()
+        self._stats = dict()
+        self._stats_lock = threading.Lock()
+        self._excel = ClsExcelHandler()
+        self._fetcher = ClsWebpageFetcher()
+
+    def run(self, jobs: List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])], time_budget_seconds: float = 0, stop_event: threading.Event = None) -> dict:
+        """
+        以管線執行工作: 規劃 → 下載 → 解析 → 正規化 → 寫入,各階段同時進行,並以有上限的佇列控制流量
+        (寫入階段只有1個執行緒,Excel檔案及資料庫不會同時被寫入)
+
+        Arguments:
+        jobs -- 工作列表
+
+        Keyword Arguments:
+        time_budget_seconds -- 執行時間上限秒數(0=不限),剩餘時間不足一個工作即不再下載,佇列中的工作捨棄 (default: 0)
+        stop_event -- 設定後立即停止,佇列中尚未寫入的工作全部捨棄(ex: 分片租約已被其他工作程序取得) (default: None)
+
+        Returns:
+        各階段統計 {階段: {count, busy_seconds, wait_seconds}}
+        """
+        self._stop_event = threading.Event()
+        self._cancel_event = stop_event
+        self._deadline = time.monotonic() + time_budget_seconds if time_budget_seconds > 0 else None
+        self._errors = list()
+        self._stats = {stage_name: {'count': 0, 'busy_seconds': 0.0, 'wait_seconds': 0.0} for stage_name in self.stage_names}
+        self._taiwan_stock.reset_progress(len(jobs))
+
+        queues = [queue.Queue(maxsize=self.buffer_size) for _ in self.stage_names[1:]]
+        stage_functions = {
+            'fetch': self._fetch,
+            'parse': self._parse,
+            'normalize': self._normalize,
+            'write': self._write
+        }
+
+        stage_threads = [[threading.Thread(target=self._plan, args=(jobs, time_budget_seconds, stop_event, queues[0]), daemon=True)]]
+        for index, stage_name in enumerate(self.stage_names[1:]):
+            output_queue = queues[index + 1] if index + 1 < len(queues) else None
+            stage_threads.append([threading.Thread(target=self._run_stage, args=(stage_name, stage_functions[stage_name], queues[index], output_queue), daemon=True) for _ in range(self.workers[stage_name])])
+
+        for threads in stage_threads:
+            for thread in threads:
+                thread.start()
+
+        for index, threads in enumerate(stage_threads):
+            for thread in threads:
+                thread.join()
+            if index < len(queues):
+                for _ in stage_threads[index + 1]:
+                    self._put(queues[index], self._sentinel, force=True)
+
+        if self._errors:
+            raise self._errors[0]
+
+        return self._stats
+
+    def _plan(self, jobs: list, time_budget_seconds: float, stop_event: threading.Event, output_queue: queue.Queue):
+        """
+        依排程器權重產生工作,略過已儲存且不需重新取得的表格
+        """
+        sheet_names = dict()
+        try:
+            for job in self._taiwan_stock.scheduler.iter_jobs(jobs, time_budget_seconds):
+                if self._stop_event.is_set() or (stop_event is not None and stop_event.is_set()):
+                    break
+                started_at = time.monotonic()
+                if not job.refresh and self._taiwan_stock.is_job_stored(job, sheet_names):
+                    continue
+                request = self._taiwan_stock.get_job_request(job)
+                self._add_stats('plan', 1, time.monotonic() - started_at, 0)
+                if not self._put(output_queue, (job, request)):
+                    break
+        except Exception as ex:
+            self._fail(ex)
+
+    def _run_stage(self, stage_name: str, stage_function: Callable, input_queue: queue.Queue, output_queue: queue.Queue):
+        """
+        由上游佇列取出項目處理後放入下游佇列,取到結束標記時停止
+        """
+        while True:
+            waited_at = time.monotonic()
+            item = input_queue.get()
+            if item is self._sentinel:
+                break
+            started_at = time.monotonic()
+            if self._is_cancelled(stage_name):
+                continue
+            try:
+                result = stage_function(*item)
+            except Exception as ex:
+                self._fail(ex)
+                continue
+            if output_queue is not None and result is None:
+                continue
+            self._add_stats(stage_name, 1, time.monotonic() - started_at, started_at - waited_at)
+            if output_queue is not None:
+                self._put(output_queue, result)
+
+    def _fetch(self, job, request) -> tuple:
+        self._fetcher.wait(*self.wait_seconds)
+        if self._is_cancelled('fetch'):
+            return None
+        return job, request, self._taiwan_stock.download_request(request)
+
+    def _parse(self, job, request, text: str) -> tuple:
+        return job, self._taiwan_stock.parse_job_table(job, request, text)
+
+    def _normalize(self, job, table: List[List[str]]) -> tuple:
+        return job, self._taiwan_stock.normalize_job_table(job, table)
+
+    def _write(self, job, table: List[List[str]]):
+        self._taiwan_stock.save_job_table(self._excel, job, table)
+
+    def _put(self, output_queue: queue.Queue, item, force: bool = False) -> bool:
+        """
+        放入佇列,佇列滿時等待(背壓);管線發生錯誤時放棄(結束標記除外)
+
+        Returns:
+        是否已放入
+        """
+        while True:
+            if self._stop_event.is_set() and not force:
+                return False
+            try:
+                output_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+    def _is_cancelled(self, stage_name: str) -> bool:
+        """
+        判斷是否捨棄佇列中的工作: 管線發生錯誤,呼叫端要求停止,或剩餘時間不足以再下載一個工作
+
+        Arguments:
+        stage_name -- 階段名稱
+
+        Returns:
+        回傳結果
+        """
+        if self._stop_event.is_set() or (self._cancel_event is not None and self._cancel_event.is_set()):
+            return True
+        if stage_name == 'fetch' and self._deadline is not None:
+            return time.monotonic() + self._taiwan_stock.scheduler.seconds_per_job > self._deadline
+        return False
+
+    def _fail(self, ex: Exception):
+        with self._stats_lock:
+            self._errors.append(ex)
+        self._stop_event.set()
+
+    def _add_stats(self, stage_name: str, count: int, busy_seconds: float, wait_seconds: float):
+        with self._stats_lock:
+            self._stats[stage_name]['count'] += count
+            self._stats[stage_name]['busy_seconds'] += busy_seconds
+            self._stats[stage_name]['wait_seconds'] += wait_seconds
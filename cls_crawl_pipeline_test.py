@@ -0,0 +1,87 @@
+import unittest
+from cls_crawl_pipeline import ClsCrawlPipeline
+from cls_taiwan_stock import ClsTaiwanStock
+from cls_excel_handler import ClsExcelHandler
+import typing
+import threading
+import tempfile
+import shutil
+import os
+
+
+class ClsCrawlPipelineTest(unittest.TestCase):
+    books_path = tempfile.gettempdir() + '\\crawl_pipeline_test'
+    excel_handler = ClsExcelHandler()
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        if os.path.isdir(self.books_path):
+            shutil.rmtree(self.books_path)
+        self.excel_handler.open_books_directory(self.books_path)
+        self.taiwan_stock = ClsTaiwanStock()
+        self.taiwan_stock.books_path = self.books_path
+        self.taiwan_stock._fetcher.download_text = lambda url, method, data: '''
+            <table class="hasBorder">
+                <tr><th>會計項目</th><th>金額</th><th>%</th></tr>
+                <tr><td> 資產總額 </td><td> 1,000 </td><td>100.00</td></tr>
+            </table>'''
+        self.crawl_pipeline = ClsCrawlPipeline(self.taiwan_stock, buffer_size=1, wait_seconds=(0, 0))
+
+        self.jobs = list()
+        for stock_id, stock_name in [('1101', '台泥'), ('1102', '亞泥')]:
+            stock = typing.NamedTuple('stock', [('id', str), ('name', str)])
+            stock.id = stock_id
+            stock.name = stock_name
+            for season in ['02', '03']:
+                self.jobs.append(self.taiwan_stock.to_job('資產負債表', stock, self.taiwan_stock.to_period('2018', season), False))
+
+    def tearDown(self):
+        self.taiwan_stock._get_store().close()
+        shutil.rmtree(self.books_path)
+    # endregion
+
+    def test_run(self):
+        stats = self.crawl_pipeline.run(self.jobs)
+        self.assertEqual([stats[stage_name]['count'] for stage_name in ClsCrawlPipeline.stage_names], [4, 4, 4, 4, 4])
+        self.assertTrue({'2018_02', '2018_03'} <= set(self.excel_handler.get_sheet_names(self.books_path + '\\1102(亞泥)_資產負債表.xlsx')))
+        self.assertEqual(self.taiwan_stock._get_store().read_table('1101', '資產負債表', '2018_03'), [['資產總額', 1000.0, 100.0]])
+
+        stats = self.crawl_pipeline.run(self.jobs)
+        self.assertEqual(stats['plan']['count'], 0)
+
+    def test_run_stop_event(self):
+        stop_event = threading.Event()
+        download_text = self.taiwan_stock._fetcher.download_text
+
+        def download_and_stop(url, method, data):
+            stop_event.set()
+            return download_text(url, method, data)
+        self.taiwan_stock._fetcher.download_text = download_and_stop
+
+        stats = self.crawl_pipeline.run(self.jobs, stop_event=stop_event)
+        self.assertEqual(stats['fetch']['count'], 1)
+        self.assertEqual(stats['write']['count'], 0)
+
+    def test_run_error(self):
+        def download_text(url, method, data):
+            raise ConnectionError('連線失敗')
+        self.taiwan_stock._fetcher.download_text = download_text
+        with self.assertRaises(ConnectionError):
+            self.crawl_pipeline.run(self.jobs)
+
+
+if __name__ == '__main__':
+    tests = ['test_run']
+    suite = unittest.TestSuite(map(ClsCrawlPipelineTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
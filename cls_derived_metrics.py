@@ -0,0 +1,229 @@
+from cls_statement_store import ClsStatementStore
+import numpy
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+
+class ClsDerivedMetrics():
+    ytd_table_types = ['綜合損益表', '現金流量表']
+    metric_names = ['quarter', 'ttm', 'qoq', 'yoy']
+    stock_batch_size = 500
+
+    def __init__(self, store: ClsStatementStore):
+        """
+        Arguments:
+        store -- 資料庫(寫入表格時標記的變動表格供refresh使用)
+        """
+        self._store = store
+        connection = self._store.connection
+        table_names = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        with connection:
+            if 'derived_metrics' not in table_names or 'derived_sources' in table_names:
+                # 第1次建立(或由舊版以雜湊值比對的快取升級): 已儲存的累計表格全部標記為需要重新計算
+                connection.execute('''
+                    INSERT OR IGNORE INTO derived_dirty (stock_id, table_type, sheet_name)
+                    SELECT DISTINCT stock_id, table_type, sheet_name FROM statements
+                    WHERE table_type IN ({0})'''.format(','.join('?' * len(self.ytd_table_types))), self.ytd_table_types)
+            connection.execute('DROP TABLE IF EXISTS derived_sources')
+        connection.executescript('''
+            CREATE TABLE IF NOT EXISTS derived_metrics (
+                stock_id TEXT NOT NULL,
+                table_type TEXT NOT NULL,
+                label TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                quarter REAL,
+                ttm REAL,
+                qoq REAL,
+                yoy REAL,
+                PRIMARY KEY (stock_id, table_type, label, sheet_name)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS derived_metrics_period ON derived_metrics (table_type, sheet_name, label);
+            ''')
+
+    def refresh(self) -> int:
+        """
+        取出寫入表格時標記的變動表格,只重新計算受影響的股票/年度季別
+        (不讀取其他已儲存的表格;非累計表格的標記直接移除)
+
+        Returns:
+        重新計算的表格數量
+        """
+        connection = self._store.connection
+
+        last_rowid = connection.execute('SELECT MAX(rowid) FROM derived_dirty').fetchone()[0]
+        if last_rowid is None:
+            return 0
+        cursor = connection.execute('''
+            SELECT stock_id, table_type, sheet_name FROM derived_dirty
+            WHERE rowid <= ? AND table_type IN ({0}) AND sheet_name GLOB '[0-9][0-9][0-9][0-9]_0[1-4]'
+            ORDER BY stock_id, table_type, sheet_name'''.format(','.join('?' * len(self.ytd_table_types))), [last_rowid] + self.ytd_table_types)
+        changed_sources = cursor.fetchall()
+        if changed_sources:
+            self.update(changed_sources)
+        # 計算期間再次寫入的表格會取得較大的rowid,留待下次計算
+        with connection:
+            connection.execute('DELETE FROM derived_dirty WHERE rowid <= ?', (last_rowid,))
+
+        return len(changed_sources)
+
+    def update(self, sources: Iterable[Tuple[str, str, str]]):
+        """
+        重新計算指定表格影響到的單季/近四季/季增率/年增率
+        (年度季別p的累計值會影響p~p+5的結果,計算時另外讀取p-5起的累計值)
+
+        Arguments:
+        sources -- (股票代號,表格類型,工作表名稱)列表
+        """
+        changed_quarters = dict()
+        for stock_id, table_type, sheet_name in sources:
+            changed_quarters.setdefault(table_type, dict()).setdefault(stock_id, set()).add(self._to_quarter_index(sheet_name))
+
+        for table_type, stock_quarters in changed_quarters.items():
+            first_quarter = min(min(quarters) for quarters in stock_quarters.values())
+            last_quarter = max(max(quarters) for quarters in stock_quarters.values()) + 5
+            output_quarters = set()
+            for quarters in stock_quarters.values():
+                for quarter in quarters:
+                    output_quarters.update(range(quarter, quarter + 6))
+
+            keys, ytd = self._load_ytd(table_type, set(stock_quarters), first_quarter - 5, last_quarter)
+            quarter_values, ttm, qoq, yoy = self.derive(ytd, first_quarter - 5)
+            self._write_metrics(table_type, set(stock_quarters), sorted(output_quarters), first_quarter - 5, keys, [quarter_values, ttm, qoq, yoy])
+
+    def _load_ytd(self, table_type: str, stock_ids: set, first_quarter: int, last_quarter: int) -> Tuple[List[Tuple[str, str]], numpy.ndarray]:
+        """
+        讀取累計值矩陣
+
+        Arguments:
+        table_type -- 表格類型
+        stock_ids -- 股票代號
+        first_quarter -- 起始季序號
+        last_quarter -- 結束季序號
+
+        Returns:
+        ((股票代號,會計項目)列表, 累計值矩陣(列=股票/會計項目,欄=連續季別,缺少=NaN))
+        """
+        sheet_names = [self._to_sheet_name(quarter) for quarter in range(first_quarter, last_quarter + 1)]
+
+        key_indexes = dict()
+        cells = list()
+        sorted_stock_ids = sorted(stock_ids)
+        for index in range(0, len(sorted_stock_ids), self.stock_batch_size):
+            batch_stock_ids = sorted_stock_ids[index:index + self.stock_batch_size]
+            cursor = self._store.connection.execute('''
+                SELECT stock_id, label, sheet_name, value FROM statements
+                WHERE table_type = ? AND stock_id IN ({0}) AND column_no = 1 AND sheet_name IN ({1}) AND value IS NOT NULL
+                ORDER BY stock_id, sheet_name, row_no'''.format(','.join('?' * len(batch_stock_ids)), ','.join('?' * len(sheet_names))), [table_type] + batch_stock_ids + sheet_names)
+            seen_cells = set()
+            for stock_id, label, sheet_name, value in cursor:
+                if (stock_id, label, sheet_name) in seen_cells:
+                    continue
+                seen_cells.add((stock_id, label, sheet_name))
+                row_index = key_indexes.setdefault((stock_id, label), len(key_indexes))
+                cells.append((row_index, self._to_quarter_index(sheet_name) - first_quarter, value))
+
+        ytd = numpy.full((len(key_indexes), len(sheet_names)), numpy.nan)
+        if cells:
+            row_indexes, column_indexes, values = zip(*cells)
+            ytd[list(row_indexes), list(column_indexes)] = values
+
+        return list(key_indexes), ytd
+
+    @staticmethod
+    def derive(ytd: numpy.ndarray, first_quarter: int) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        以向量運算將累計值拆成單季值,並計算近四季合計/季增率/年增率
+
+        Arguments:
+        ytd -- 累計值矩陣(列=股票/會計項目,欄=連續季別)
+        first_quarter -- 第1欄的季序號
+
+        Returns:
+        (單季值, 近四季合計, 季增率, 年增率)矩陣,無法計算為NaN
+        """
+        def shift(values: numpy.ndarray, periods: int) -> numpy.ndarray:
+            shifted = numpy.full(values.shape, numpy.nan)
+            if periods < values.shape[1]:
+                shifted[:, periods:] = values[:, :values.shape[1] - periods]
+            return shifted
+
+        def growth(values: numpy.ndarray, base_values: numpy.ndarray) -> numpy.ndarray:
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                result = (values - base_values) / numpy.abs(base_values)
+            result[base_values == 0] = numpy.nan
+            return result
+
+        seasons = (numpy.arange(ytd.shape[1]) + first_quarter) % 4 + 1
+        quarter_values = numpy.where(seasons == 1, ytd, ytd - shift(ytd, 1))
+
+        padded = numpy.concatenate([numpy.full((ytd.shape[0], 3), numpy.nan), quarter_values], axis=1)
+        ttm = numpy.lib.stride_tricks.sliding_window_view(padded, 4, axis=1).sum(axis=2)
+
+        qoq = growth(quarter_values, shift(quarter_values, 1))
+        yoy = growth(quarter_values, shift(quarter_values, 4))
+
+        return quarter_values, ttm, qoq, yoy
+
+    def _write_metrics(self, table_type: str, stock_ids: set, output_quarters: List[int], first_quarter: int, keys: List[Tuple[str, str]], metrics: List[numpy.ndarray]):
+        connection = self._store.connection
+        column_count = metrics[0].shape[1]
+        output_sheet_names = [self._to_sheet_name(quarter) for quarter in output_quarters]
+        output_columns = [quarter - first_quarter for quarter in output_quarters if quarter - first_quarter < column_count]
+
+        rows = list()
+        for row_index, (stock_id, label) in enumerate(keys):
+            for column_index in output_columns:
+                values = [metric[row_index, column_index] for metric in metrics]
+                if not all(numpy.isnan(value) for value in values):
+                    rows.append([stock_id, table_type, label, self._to_sheet_name(first_quarter + column_index)] + [None if numpy.isnan(value) else float(value) for value in values])
+
+        with connection:
+            for stock_id in stock_ids:
+                connection.execute('''
+                    DELETE FROM derived_metrics WHERE stock_id = ? AND table_type = ? AND sheet_name IN ({0})'''.format(','.join('?' * len(output_sheet_names))), [stock_id, table_type] + output_sheet_names)
+            connection.executemany('INSERT INTO derived_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def get_metrics(self, stock_id: str, table_type: str, label: str) -> List[Tuple[str, float, float, float, float]]:
+        """
+        取得單一股票會計項目的衍生數值(新到舊)
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型(綜合損益表/現金流量表)
+        label -- 會計項目
+
+        Returns:
+        (工作表名稱,單季值,近四季合計,季增率,年增率)列表
+        """
+        return self._store.connection.execute('''
+            SELECT sheet_name, quarter, ttm, qoq, yoy FROM derived_metrics
+            WHERE stock_id = ? AND table_type = ? AND label = ?
+            ORDER BY sheet_name DESC''', (stock_id, table_type, label)).fetchall()
+
+    def get_period_metric(self, table_type: str, sheet_name: str, label: str, metric_name: str) -> dict:
+        """
+        取得所有股票同一年度季別/會計項目的衍生數值
+
+        Arguments:
+        table_type -- 表格類型(綜合損益表/現金流量表)
+        sheet_name -- 工作表名稱
+        label -- 會計項目
+        metric_name -- 衍生數值(quarter/ttm/qoq/yoy)
+
+        Returns:
+        股票代號/數值對照
+        """
+        if metric_name not in self.metric_names:
+            raise ValueError('metric_name值只能是(quarter/ttm/qoq/yoy)其中之一')
+
+        cursor = self._store.connection.execute('''
+            SELECT stock_id, {0} FROM derived_metrics
+            WHERE table_type = ? AND sheet_name = ? AND label = ?'''.format(metric_name), (table_type, sheet_name, label))
+        return dict(cursor.fetchall())
+
+    def _to_quarter_index(self, sheet_name: str) -> int:
+        return int(sheet_name[0:4]) * 4 + int(sheet_name[5:7]) - 1
+
+    def _to_sheet_name(self, quarter_index: int) -> str:
+        return '{0}_{1:02d}'.format(quarter_index // 4, quarter_index % 4 + 1)
@@ -0,0 +1,69 @@
+import unittest
+from cls_derived_metrics import ClsDerivedMetrics
+from cls_statement_store import ClsStatementStore
+
+
+class ClsDerivedMetricsTest(unittest.TestCase):
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        self.statement_store = ClsStatementStore(':memory:')
+        self.derived_metrics = ClsDerivedMetrics(self.statement_store)
+        ytd_values = {'2017_01': 10, '2017_02': 30, '2017_03': 60, '2017_04': 100, '2018_01': 20, '2018_02': 50, '2018_03': 90}
+        for sheet_name, value in ytd_values.items():
+            self.statement_store.write_table('1101', '台泥', '綜合損益表', sheet_name, [['本期淨利(淨損)', str(value)]])
+
+    def tearDown(self):
+        self.statement_store.close()
+    # endregion
+
+    def test_refresh(self):
+        self.assertEqual(self.derived_metrics.refresh(), 7)
+        metrics = dict((row[0], row[1:]) for row in self.derived_metrics.get_metrics('1101', '綜合損益表', '本期淨利(淨損)'))
+        self.assertEqual(metrics['2017_04'], (40.0, 100.0, (40.0 - 30.0) / 30.0, None))
+        self.assertEqual(metrics['2018_03'][0:2], (40.0, 130.0))
+        self.assertEqual(metrics['2018_03'][3], (40.0 - 30.0) / 30.0)
+        self.assertEqual(self.derived_metrics.refresh(), 0)
+
+    def test_refresh_incremental(self):
+        self.derived_metrics.refresh()
+        self.statement_store.write_table('1101', '台泥', '綜合損益表', '2018_04', [['本期淨利(淨損)', '150']])
+        self.statement_store.write_table('1102', '亞泥', '綜合損益表', '2018_01', [['本期淨利(淨損)', '(5)']])
+        self.assertEqual(self.derived_metrics.refresh(), 2)
+
+        self.assertEqual(self.derived_metrics.get_period_metric('綜合損益表', '2018_04', '本期淨利(淨損)', 'quarter'), {'1101': 60.0})
+        self.assertEqual(self.derived_metrics.get_period_metric('綜合損益表', '2018_04', '本期淨利(淨損)', 'ttm'), {'1101': 150.0})
+        self.assertEqual(self.derived_metrics.get_period_metric('綜合損益表', '2018_01', '本期淨利(淨損)', 'quarter'), {'1101': 20.0, '1102': -5.0})
+
+    def test_refresh_restatement(self):
+        self.statement_store.write_table('1101', '台泥', '綜合損益表', '2018_01', [['營業收入', '100'], ['營業成本', '60']])
+        self.derived_metrics.refresh()
+        self.statement_store.write_table('1101', '台泥', '綜合損益表', '2018_01', [['營業收入', '60'], ['營業成本', '100']])
+        self.assertEqual(self.derived_metrics.refresh(), 1)
+        self.assertEqual(self.derived_metrics.get_period_metric('綜合損益表', '2018_01', '營業收入', 'quarter'), {'1101': 60.0})
+
+    def test_refresh_dirty(self):
+        self.derived_metrics.refresh()
+        self.statement_store.write_table('1101', '台泥', '資產負債表', '2018_03', [['資產總額', '1,000']])
+        self.assertEqual(self.derived_metrics.refresh(), 0)
+        self.assertEqual(self.statement_store.connection.execute('SELECT COUNT(*) FROM derived_dirty').fetchone()[0], 0)
+
+        self.assertEqual(ClsDerivedMetrics(self.statement_store).refresh(), 0)
+        self.statement_store.connection.execute('DROP TABLE derived_metrics')
+        self.assertEqual(ClsDerivedMetrics(self.statement_store).refresh(), 7)
+
+
+if __name__ == '__main__':
+    tests = ['test_refresh']
+    suite = unittest.TestSuite(map(ClsDerivedMetricsTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -3,6 +3,8 @@ from openpyxl.compat import range
 import os
 from typing import Union
 from typing import List
+from typing import Iterator
+from typing import Tuple
 from openpyxl import load_workbook
 
 
@@ -61,6 +63,32 @@ class ClsExcelHandler():
             self._book = load_workbook(book_path)
         self._sheet = self._book.active
 
+    def create_book(self):
+        """
+        建立新的活頁簿(覆寫時使用,不讀取既有檔案)
+        """
+        self._book = Workbook()
+        self._sheet = self._book.active
+
+    def open_write_only_book(self):
+        """
+        建立唯寫活頁簿(逐列寫入磁碟,記憶體用量固定;只能新增工作表及附加列)
+        """
+        self._book = Workbook(write_only=True)
+        self._sheet = None
+        self._write_only_sheets = dict()
+
+    def open_write_only_sheet(self, sheet_name: str):
+        """
+        開啟唯寫活頁簿的工作表(不存在則先建立,之後以write_to_sheet附加列)
+
+        Arguments:
+        sheet_name -- 工作表名稱
+        """
+        if sheet_name not in self._write_only_sheets:
+            self._write_only_sheets[sheet_name] = self._book.create_sheet(sheet_name)
+        self._sheet = self._write_only_sheets[sheet_name]
+
     def open_sheet(self, sheet_name: str):
         """
         開啟工作表(不存在則先建立)
@@ -99,3 +127,58 @@ class ClsExcelHandler():
             return True
         else:
             return False
+
+    def clear_sheet(self):
+        """
+        清空目前工作表(保留名稱及位置)
+        """
+        sheet_name = self._sheet.title
+        sheet_index = self._book.index(self._sheet)
+        self._book.remove(self._sheet)
+        self._sheet = self._book.create_sheet(sheet_name, sheet_index)
+        self._book.active = self._sheet
+
+    def get_sheet_values(self) -> List[list]:
+        """
+        取得目前工作表的儲存格值
+
+        Returns:
+        逐列儲存格值
+        """
+        return [list(row) for row in self._sheet.iter_rows(values_only=True)]
+
+    def get_sheet_names(self, book_path: str) -> List[str]:
+        """
+        取得活頁簿的工作表名稱(唯讀開啟,不載入儲存格)
+
+        Arguments:
+        book_path -- 本機路徑
+
+        Returns:
+        工作表名稱列表(活頁簿不存在則為空)
+        """
+        if not self.is_book_existed(book_path):
+            return list()
+
+        book = load_workbook(book_path, read_only=True)
+        sheet_names = book.sheetnames
+        book.close()
+
+        return sheet_names
+
+    def read_book_sheets(self, book_path: str) -> Iterator[Tuple[str, Iterator[tuple]]]:
+        """
+        以唯讀模式逐一讀取活頁簿的工作表(不影響目前開啟的活頁簿)
+
+        Arguments:
+        book_path -- 本機路徑
+
+        Returns:
+        (工作表名稱,逐列儲存格值)產生器;每個工作表的列需在取得下一個工作表前讀取
+        """
+        book = load_workbook(book_path, read_only=True)
+        try:
+            for sheet in book.worksheets:
+                yield sheet.title, sheet.iter_rows(values_only=True)
+        finally:
+            book.close()
@@ -0,0 +1,130 @@
+from cls_webpage_fetcher import ClsWebpageFetcher
+from cls_taiwan_stock import ClsTaiwanStock
+from lxml import etree
+import re
+import time
+from typing import List
+from typing import NamedTuple
+
+
+class ClsFilingWatcher():
+    statment_keywords = ['財務報告', '財務報表', '財報', '合併報表', '個體報表', '重編']
+    basic_info_keywords = ['董事長', '總經理', '發言人', '簽證會計師', '會計主管', '財務主管', '地址', '更名', '資本額']
+
+    def __init__(self, taiwan_stock: ClsTaiwanStock):
+        self._taiwan_stock = taiwan_stock
+        self._fetcher = ClsWebpageFetcher()
+        self._seen_filing_keys = set()
+        self._stock_names = dict()
+
+    def get_latest_filings(self) -> List[NamedTuple('filing', [('stock_id', str), ('stock_name', str), ('date', str), ('time', str), ('subject', str)])]:
+        """
+        取得公開資訊觀測站即時重大訊息列表
+
+        Returns:
+        重大訊息列表(公司代號+公司簡稱+發言日期+發言時間+主旨)
+        """
+        html = self._fetcher.download_html('http://mops.twse.com.tw/mops/web/t05sr01_1')
+        return self._parse_filings(html)
+
+    def _parse_filings(self, html: etree.HTML) -> List[NamedTuple('filing', [('stock_id', str), ('stock_name', str), ('date', str), ('time', str), ('subject', str)])]:
+        filings = list()
+
+        rows = self._fetcher.find_elements(html, '//table[@class="hasBorder"]//tr[count(td) >= 5]')
+        for row in rows:
+            cells = [''.join(cell.itertext()).strip() for cell in row.xpath('./td')]
+            filing = NamedTuple('filing', [('stock_id', str), ('stock_name', str), ('date', str), ('time', str), ('subject', str)])
+            filing.stock_id = cells[0]
+            filing.stock_name = cells[1]
+            filing.date = cells[2]
+            filing.time = cells[3]
+            filing.subject = cells[4]
+            filings.append(filing)
+
+        return filings
+
+    def get_filing_jobs(self, filings: List[NamedTuple('filing', [('stock_id', str), ('stock_name', str), ('date', str), ('time', str), ('subject', str)])]) -> List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])]:
+        """
+        將尚未處理過的重大訊息轉換為工作列表(只處理上巿股票且與財報/基本資料相關的訊息)
+
+        Arguments:
+        filings -- 重大訊息列表
+
+        Returns:
+        工作列表(表格類型+股票+年度季別+是否重新取得)
+        """
+        jobs = list()
+        job_keys = set()
+
+        for filing in filings:
+            filing_key = (filing.stock_id, filing.date, filing.time, filing.subject)
+            if filing_key in self._seen_filing_keys:
+                continue
+            self._seen_filing_keys.add(filing_key)
+
+            if self._stock_names and filing.stock_id not in self._stock_names:
+                continue
+
+            stock = NamedTuple('stock', [('id', str), ('name', str)])
+            stock.id = filing.stock_id
+            stock.name = self._stock_names.get(filing.stock_id, filing.stock_name)
+
+            table_jobs = list()
+            if any(keyword in filing.subject for keyword in self.statment_keywords):
+                table_jobs.extend(self._taiwan_stock.get_refresh_jobs(stock, self._get_filing_period(filing.subject)))
+            if any(keyword in filing.subject for keyword in self.basic_info_keywords):
+                table_jobs.extend(self._taiwan_stock.get_refresh_jobs(stock))
+
+            for job in table_jobs:
+                job_key = (job.table_type, job.stock.id, job.period.ad_year + '_' + job.period.season if job.period else '')
+                if job_key not in job_keys:
+                    job_keys.add(job_key)
+                    jobs.append(job)
+
+        return jobs
+
+    def _get_filing_period(self, subject: str) -> NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]):
+        """
+        由訊息主旨判斷財報年度季別(2~3位數為民國年,4位數為西元年;無法判斷則為已過申報期限的最新年度季別)
+
+        Arguments:
+        subject -- 訊息主旨
+
+        Returns:
+        年度季別
+        """
+        seasons = {'一': '01', '二': '02', '三': '03', '四': '04', '1': '01', '2': '02', '3': '03', '4': '04'}
+
+        def to_ad_year(year: str) -> str:
+            return year if len(year) == 4 else str(int(year) + 1911)
+
+        match = re.search(r'(?<!\d)(\d{2,4})\s*年度?\s*第\s*([一二三四1-4])\s*季', subject)
+        if match:
+            return self._taiwan_stock.to_period(to_ad_year(match.group(1)), seasons[match.group(2)])
+
+        match = re.search(r'(?<!\d)(\d{2,4})\s*年度', subject)
+        if match:
+            return self._taiwan_stock.to_period(to_ad_year(match.group(1)), '04')
+
+        return self._taiwan_stock.get_latest_period()
+
+    def watch(self, interval_minutes: int = 30, rounds: int = 0):
+        """
+        定期檢查即時重大訊息,只重新取得有申報/更正財報或變更基本資料的公司
+
+        Keyword Arguments:
+        interval_minutes -- 檢查間隔分鐘數 (default: 30)
+        rounds -- 檢查次數(0=不限) (default: 0)
+        """
+        self._taiwan_stock.open_books_directory(self._taiwan_stock.books_path)
+        self._stock_names = {stock.id: stock.name for stock in self._taiwan_stock.get_stock_list('', '')}
+
+        current_round = 0
+        while rounds == 0 or current_round < rounds:
+            current_round += 1
+
+            jobs = self.get_filing_jobs(self.get_latest_filings())
+            self._taiwan_stock.run_jobs(jobs)
+
+            if rounds == 0 or current_round < rounds:
+                time.sleep(interval_minutes * 60)
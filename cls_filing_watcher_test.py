@@ -0,0 +1,64 @@
+import unittest
+from cls_filing_watcher import ClsFilingWatcher
+from cls_taiwan_stock import ClsTaiwanStock
+from lxml import etree
+
+
+class ClsFilingWatcherTest(unittest.TestCase):
+    filing_watcher = ClsFilingWatcher(ClsTaiwanStock())
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        self.filing_watcher._seen_filing_keys = set()
+        self.filing_watcher._stock_names = {'1101': '台泥', '2330': '台積電'}
+
+    def tearDown(self):
+        pass
+    # endregion
+
+    def test_get_latest_filings(self):
+        filings = self.filing_watcher.get_latest_filings()
+        self.assertTrue(len(filings) > 0)
+
+    def test_get_filing_jobs(self):
+        html = etree.HTML('''
+            <table class="hasBorder">
+                <tr><th>公司代號</th><th>公司簡稱</th><th>發言日期</th><th>發言時間</th><th>主旨</th></tr>
+                <tr><td>1101</td><td>台泥</td><td>113/11/12</td><td>17:30:00</td><td>公告本公司113年第三季合併財務報告</td></tr>
+                <tr><td>2330</td><td>台積電</td><td>113/11/12</td><td>17:31:00</td><td>公告本公司發言人異動</td></tr>
+                <tr><td>6488</td><td>環球晶</td><td>113/11/12</td><td>17:32:00</td><td>公告本公司113年第三季合併財務報告</td></tr>
+            </table>''')
+        filings = self.filing_watcher._parse_filings(html)
+        self.assertEqual(len(filings), 3)
+
+        jobs = self.filing_watcher.get_filing_jobs(filings)
+        statment_jobs = [job for job in jobs if job.stock.id == '1101']
+        self.assertEqual(len(statment_jobs), 8)
+        self.assertTrue(all(job.refresh for job in statment_jobs))
+        self.assertEqual(statment_jobs[0].period.ad_year + '_' + statment_jobs[0].period.season, '2024_03')
+        self.assertEqual([job.table_type for job in jobs if job.stock.id == '2330'], ['基本資料'])
+        self.assertFalse([job for job in jobs if job.stock.id == '6488'])
+
+        self.assertFalse(self.filing_watcher.get_filing_jobs(filings))
+
+    def test_get_filing_period(self):
+        for subject, sheet_name in [('公告本公司113年第三季合併財務報告', '2024_03'), ('公告本公司2024年第三季合併財務報告', '2024_03'), ('公告本公司112年度財務報告', '2023_04'), ('公告本公司2023年度財務報告', '2023_04')]:
+            period = self.filing_watcher._get_filing_period(subject)
+            self.assertEqual(period.ad_year + '_' + period.season, sheet_name)
+
+
+if __name__ == '__main__':
+    tests = ['test_get_filing_jobs']
+    suite = unittest.TestSuite(map(ClsFilingWatcherTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,101 @@
+import heapq
+import time
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+
+
+class ClsJobScheduler():
+    default_table_priorities = {
+        '資產負債表': 30,
+        '綜合損益表': 30,
+        '現金流量表': 30,
+        '基本資料': 20,
+        '財務分析': 15,
+        '權益變動表': 10,
+        '股利分配': 10,
+        '財報附註': 5,
+        '會計報告': 5
+    }
+
+    def __init__(self, watchlist: List[str] = None, stock_weights: dict = None, table_priorities: dict = None, watchlist_weight: float = 100, recency_weight: float = 40, seconds_per_job: float = 35):
+        """
+        Keyword Arguments:
+        watchlist -- 優先股票代號列表 (default: None)
+        stock_weights -- 股票代號/額外權重對照(ex: 依市值排名給大型股加分) (default: None)
+        table_priorities -- 表格類型/權重對照 (default: default_table_priorities)
+        watchlist_weight -- 優先股票的權重 (default: 100)
+        recency_weight -- 最新年度季別的權重,每舊1季減半 (default: 40)
+        seconds_per_job -- 每個工作預估秒數(含等待間隔),用來判斷剩餘時間是否足夠 (default: 35)
+        """
+        self.watchlist = set(watchlist or [])
+        self.stock_weights = stock_weights or dict()
+        self.table_priorities = table_priorities or self.default_table_priorities
+        self.watchlist_weight = watchlist_weight
+        self.recency_weight = recency_weight
+        self.seconds_per_job = seconds_per_job
+
+    def get_priority(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)]), newest_quarter: int) -> float:
+        """
+        計算工作權重(越大越先執行)
+
+        Arguments:
+        job -- 工作
+        newest_quarter -- 所有工作中最新的季序號
+
+        Returns:
+        權重
+        """
+        priority = self.table_priorities.get(job.table_type, 0)
+        priority += self.stock_weights.get(job.stock.id, 0)
+        if job.stock.id in self.watchlist:
+            priority += self.watchlist_weight
+
+        quarter = self._to_quarter_index(job)
+        age = max(newest_quarter - quarter, 0) if quarter is not None else 0
+        priority += self.recency_weight / (2 ** age)
+
+        return priority
+
+    def schedule(self, jobs: List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])]) -> List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])]:
+        """
+        依權重排序工作(權重相同則維持原順序)
+
+        Arguments:
+        jobs -- 工作列表
+
+        Returns:
+        排序後的工作列表
+        """
+        return list(self.iter_jobs(jobs))
+
+    def iter_jobs(self, jobs: List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])], time_budget_seconds: float = 0) -> Iterator[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])]:
+        """
+        依權重逐一取出工作;有時間上限時,剩餘時間不足一個工作就停止(重要的資料已先取得)
+
+        Arguments:
+        jobs -- 工作列表
+
+        Keyword Arguments:
+        time_budget_seconds -- 執行時間上限秒數(0=不限) (default: 0)
+
+        Returns:
+        工作產生器
+        """
+        quarters = [self._to_quarter_index(job) for job in jobs if job.period is not None and job.period.season != '00']
+        newest_quarter = max(quarters) if quarters else 0
+
+        heap = [(-self.get_priority(job, newest_quarter), index, job) for index, job in enumerate(jobs)]
+        heapq.heapify(heap)
+
+        started_at = time.monotonic()
+        while heap:
+            if time_budget_seconds > 0 and time.monotonic() - started_at + self.seconds_per_job > time_budget_seconds:
+                break
+            yield heapq.heappop(heap)[2]
+
+    def _to_quarter_index(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])) -> int:
+        if job.period is None:
+            return None
+        season = int(job.period.season) if job.period.season != '00' else 4
+        return int(job.period.ad_year) * 4 + season - 1
@@ -0,0 +1,58 @@
+import unittest
+from cls_job_scheduler import ClsJobScheduler
+import typing
+
+
+class ClsJobSchedulerTest(unittest.TestCase):
+    job_scheduler = ClsJobScheduler(watchlist=['2330'])
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        self.jobs = list()
+        for stock_id in ['1101', '2330']:
+            stock = typing.NamedTuple('stock', [('id', str), ('name', str)])
+            stock.id = stock_id
+            stock.name = ''
+            for ad_year, season in [('2017', '03'), ('2018', '03')]:
+                period = typing.NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])
+                period.roc_year = str(int(ad_year) - 1911)
+                period.ad_year = ad_year
+                period.season = season
+                for table_type in ['財報附註', '資產負債表']:
+                    job = typing.NamedTuple('job', [('table_type', str), ('stock', typing.NamedTuple), ('period', typing.NamedTuple), ('refresh', bool)])
+                    job.table_type = table_type
+                    job.stock = stock
+                    job.period = period
+                    job.refresh = False
+                    self.jobs.append(job)
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+    # endregion
+
+    def test_schedule(self):
+        jobs = self.job_scheduler.schedule(self.jobs)
+        self.assertEqual(len(jobs), len(self.jobs))
+        self.assertEqual([(job.stock.id, job.period.ad_year, job.table_type) for job in jobs[0:2]], [('2330', '2018', '資產負債表'), ('2330', '2018', '財報附註')])
+        self.assertEqual([(job.stock.id, job.period.ad_year, job.table_type) for job in jobs[4:5]], [('1101', '2018', '資產負債表')])
+
+    def test_iter_jobs_time_budget(self):
+        self.assertEqual(list(self.job_scheduler.iter_jobs(self.jobs, 1)), [])
+        self.assertEqual(len(list(self.job_scheduler.iter_jobs(self.jobs, 3600))), len(self.jobs))
+
+
+if __name__ == '__main__':
+    tests = ['test_schedule']
+    suite = unittest.TestSuite(map(ClsJobSchedulerTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,129 @@
+from cls_excel_handler import ClsExcelHandler
+from cls_statement_table import ClsStatementTable
+import math
+import os
+import re
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+from typing import Union
+
+
+class ClsStatementExporter():
+    book_name_pattern = re.compile(r'^(?P<id>[^(]+)\((?P<name>.*)\)_(?P<table_type>[^_]+)\.xlsx$')
+    sheet_name_pattern = re.compile(r'^\d{4}_\d{2}$')
+
+    def __init__(self, books_path: str):
+        self.books_path = books_path
+        self._excel = ClsExcelHandler()
+
+    def export_table_book(self, table_type: str, export_path: str):
+        """
+        匯出整個巿場單一表格類型的彙總活頁簿(每個年度季別一個工作表,列=股票,欄=會計項目)
+        (每個會計項目只匯出第1個數值欄;權益變動表(每個權益組成一欄)/股利分配(含表頭列)匯出的內容不完整)
+
+        Arguments:
+        table_type -- 表格類型
+        export_path -- 匯出的本機路徑
+        """
+        self._export(export_path, [table_type], '', True)
+
+    def export_period_book(self, sheet_name: str, export_path: str, table_types: Tuple[str, ...] = ('資產負債表', '綜合損益表', '現金流量表')):
+        """
+        匯出整個巿場單一年度季別的彙總活頁簿(每個表格類型一個工作表,列=股票,欄=會計項目)
+        (每個會計項目只匯出第1個數值欄,預設只包含每個項目一個數值的表格類型)
+
+        Arguments:
+        sheet_name -- 年度季別工作表名稱(ex: 2018_03)
+        export_path -- 匯出的本機路徑
+
+        Keyword Arguments:
+        table_types -- 表格類型列表 (default: ('資產負債表', '綜合損益表', '現金流量表'))
+        """
+        self._export(export_path, list(table_types), sheet_name, False)
+
+    def get_archive_books(self, table_type: str) -> List[NamedTuple('book', [('stock_id', str), ('stock_name', str), ('table_type', str), ('book_path', str)])]:
+        """
+        取得已儲存的指定表格類型活頁簿(依股票代號排序)
+
+        Arguments:
+        table_type -- 表格類型(空白=全部)
+
+        Returns:
+        活頁簿列表(股票代號+股票名稱+表格類型+本機路徑)
+        """
+        books = list()
+
+        for file_name in sorted(os.listdir(self.books_path)):
+            match = self.book_name_pattern.match(file_name)
+            if match and (table_type == '' or match.group('table_type') == table_type):
+                book = NamedTuple('book', [('stock_id', str), ('stock_name', str), ('table_type', str), ('book_path', str)])
+                book.stock_id = match.group('id')
+                book.stock_name = match.group('name')
+                book.table_type = match.group('table_type')
+                book.book_path = self.books_path + '\\' + file_name
+                books.append(book)
+
+        return books
+
+    def _read_archive(self, table_types: List[str], sheet_name: str, group_by_table: bool) -> Iterator[tuple]:
+        """
+        逐一讀取已儲存的工作表
+
+        Arguments:
+        table_types -- 表格類型列表
+        sheet_name -- 只讀取此工作表(空白=全部年度季別)
+        group_by_table -- True=依年度季別分工作表, False=依表格類型分工作表
+
+        Returns:
+        (匯出工作表名稱,股票代號,股票名稱,逐列儲存格值)產生器
+        """
+        for table_type in table_types:
+            for book in self.get_archive_books(table_type):
+                for source_sheet_name, rows in self._excel.read_book_sheets(book.book_path):
+                    if table_type == '基本資料':
+                        export_sheet_name = table_type
+                    elif not self.sheet_name_pattern.match(source_sheet_name) or (sheet_name != '' and source_sheet_name != sheet_name):
+                        continue
+                    else:
+                        export_sheet_name = source_sheet_name if group_by_table else table_type
+                    yield export_sheet_name, book.stock_id, book.stock_name, rows
+
+    def _export(self, export_path: str, table_types: List[str], sheet_name: str, group_by_table: bool):
+        """
+        以唯寫模式串流匯出彙總活頁簿;第1次讀取收集會計項目(欄位),第2次讀取逐列寫入(每個會計項目只取第1個數值欄)
+
+        Arguments:
+        export_path -- 匯出的本機路徑
+        table_types -- 表格類型列表
+        sheet_name -- 只匯出此年度季別(空白=全部)
+        group_by_table -- True=依年度季別分工作表, False=依表格類型分工作表
+        """
+        sheet_labels = dict()
+        for export_sheet_name, _, _, rows in self._read_archive(table_types, sheet_name, group_by_table):
+            labels = sheet_labels.setdefault(export_sheet_name, dict())
+            for row in rows:
+                if row and row[0] is not None:
+                    labels.setdefault(row[0], None)
+
+        self._excel.open_write_only_book()
+        for export_sheet_name in sorted(sheet_labels, reverse=True) if group_by_table else sheet_labels:
+            self._excel.open_write_only_sheet(export_sheet_name)
+            self._excel.write_to_sheet(['股票代號', '股票名稱'] + list(sheet_labels[export_sheet_name]))
+
+        for export_sheet_name, stock_id, stock_name, rows in self._read_archive(table_types, sheet_name, group_by_table):
+            values = dict()
+            for row in rows:
+                if row and row[0] is not None and row[0] not in values:
+                    values[row[0]] = self._to_value(row[1] if len(row) > 1 else None)
+            self._excel.open_write_only_sheet(export_sheet_name)
+            self._excel.write_to_sheet([stock_id, stock_name] + [values.get(label) for label in sheet_labels[export_sheet_name]])
+
+        self._excel.save_book(export_path)
+
+    def _to_value(self, cell: Union[str, float, None]) -> Union[str, float, None]:
+        value = ClsStatementTable.to_number(cell)
+        if math.isnan(value):
+            return cell if cell != '' else None
+        return value
@@ -0,0 +1,62 @@
+import unittest
+from cls_statement_exporter import ClsStatementExporter
+from cls_excel_handler import ClsExcelHandler
+import tempfile
+import os
+
+
+class ClsStatementExporterTest(unittest.TestCase):
+    books_path = tempfile.gettempdir() + '\\statement_exporter_test'
+    excel_handler = ClsExcelHandler()
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        self.excel_handler.open_books_directory(self.books_path)
+        for stock_id, stock_name, values in [('1101', '台泥', ['1,000', '(200)']), ('1102', '亞泥', ['3,000', '400'])]:
+            book_path = self.books_path + '\\' + stock_id + '(' + stock_name + ')_資產負債表.xlsx'
+            self.excel_handler.open_book(book_path)
+            self.excel_handler.open_sheet('2018_03')
+            self.excel_handler.write_to_sheet([['資產總額', values[0], '100.00'], ['負債總額', values[1], '20.00']])
+            self.excel_handler.open_sheet('2018_02')
+            self.excel_handler.write_to_sheet([['資產總額', values[0], '100.00']])
+            self.excel_handler.save_book(book_path)
+        self.statement_exporter = ClsStatementExporter(self.books_path)
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+    # endregion
+
+    def test_export_table_book(self):
+        export_path = tempfile.gettempdir() + '\\全市場_資產負債表.xlsx'
+        self.statement_exporter.export_table_book('資產負債表', export_path)
+        self.assertTrue(os.path.isfile(export_path))
+
+        sheets = {sheet_name: list(rows) for sheet_name, rows in self.excel_handler.read_book_sheets(export_path)}
+        self.assertEqual(list(sheets), ['2018_03', '2018_02'])
+        self.assertEqual(sheets['2018_03'], [('股票代號', '股票名稱', '資產總額', '負債總額'), ('1101', '台泥', 1000, -200), ('1102', '亞泥', 3000, 400)])
+        self.assertEqual(sheets['2018_02'], [('股票代號', '股票名稱', '資產總額'), ('1101', '台泥', 1000), ('1102', '亞泥', 3000)])
+
+    def test_export_period_book(self):
+        export_path = tempfile.gettempdir() + '\\全市場_2018_03.xlsx'
+        self.statement_exporter.export_period_book('2018_03', export_path)
+
+        sheets = {sheet_name: list(rows) for sheet_name, rows in self.excel_handler.read_book_sheets(export_path)}
+        self.assertEqual(list(sheets), ['資產負債表'])
+        self.assertEqual(len(sheets['資產負債表']), 3)
+
+
+if __name__ == '__main__':
+    tests = ['test_export_table_book']
+    suite = unittest.TestSuite(map(ClsStatementExporterTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
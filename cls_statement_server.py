@@ -0,0 +1,191 @@
+from cls_statement_store import ClsStatementStore
+from cls_derived_metrics import ClsDerivedMetrics
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+import json
+import math
+import threading
+
+
+class ClsStatementServer():
+    def __init__(self, store: ClsStatementStore, cache_size: int = 4096):
+        self._store = store
+        self._metrics = ClsDerivedMetrics(store)
+        self._store_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_size = cache_size
+        self._data_version = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def serve(self, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+        """
+        建立HTTP/JSON查詢服務(呼叫serve_forever開始服務)
+
+        Keyword Arguments:
+        host -- 主機位址 (default: '127.0.0.1')
+        port -- 連接埠(0=自動指定) (default: 8765)
+
+        Returns:
+        HTTP服務
+        """
+        statement_server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                self._send(*statement_server.query(url.path, dict(parse_qsl(url.query))))
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                if url.path != '/batch':
+                    self._send(404, {'error': '只能POST到/batch'})
+                    return
+                try:
+                    requests = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+                except ValueError:
+                    self._send(400, {'error': '內容必須是JSON陣列'})
+                    return
+                if not isinstance(requests, list):
+                    self._send(400, {'error': '內容必須是JSON陣列'})
+                    return
+                results = list()
+                for request in requests:
+                    if not statement_server.is_valid_request(request):
+                        results.append({'status': 400, 'result': {'error': '每個查詢必須是{path: 文字, params: {參數: 文字/數字}}物件'}})
+                        continue
+                    status, result = statement_server.query(request.get('path', ''), request.get('params', dict()))
+                    results.append({'status': status, 'result': result})
+                self._send(200, results)
+
+            def _send(self, status: int, result):
+                content = json.dumps(result, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ThreadingHTTPServer((host, port), RequestHandler)
+
+    def is_valid_request(self, request) -> bool:
+        """
+        檢查批次查詢的項目格式
+
+        Arguments:
+        request -- 批次查詢的項目
+
+        Returns:
+        回傳結果
+        """
+        if not isinstance(request, dict) or not isinstance(request.get('path', ''), str) or not isinstance(request.get('params', dict()), dict):
+            return False
+        return all(isinstance(value, (str, int, float)) for value in request.get('params', dict()).values())
+
+    def query(self, path: str, params: dict) -> tuple:
+        """
+        執行查詢
+
+        Arguments:
+        path -- /statement(單一股票最近n季表格) 或 /metric(所有股票同一季的會計項目/衍生數值)
+        params -- 查詢參數
+
+        Returns:
+        (HTTP狀態碼, 結果)
+        """
+        try:
+            if path == '/statement':
+                return 200, self.get_statements(params['stock_id'], params['table_type'], int(params.get('periods', 8)))
+            elif path == '/metric':
+                return 200, self.get_metric(params['table_type'], params['sheet_name'], params['label'], params.get('metric', ''), int(params.get('column_no', 1)))
+            elif path == '/stats':
+                return 200, {'cache_size': len(self._cache), 'cache_hits': self.cache_hits, 'cache_misses': self.cache_misses}
+            else:
+                return 404, {'error': '路徑只能是(/statement//metric//stats//batch)其中之一'}
+        except KeyError as ex:
+            return 400, {'error': '缺少參數: ' + str(ex)}
+        except (ValueError, TypeError) as ex:
+            return 400, {'error': str(ex)}
+
+    def get_statements(self, stock_id: str, table_type: str, period_count: int) -> dict:
+        """
+        取得單一股票最近n季的表格
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+        period_count -- 季數
+
+        Returns:
+        {stock_id, table_type, tables: [{sheet_name, records}]}
+        """
+        sheet_names = self._get_cached(('sheet_names', stock_id, table_type), lambda: self._store.get_sheet_names(stock_id, table_type))
+        tables = list()
+        for sheet_name in sheet_names[0:period_count]:
+            records = self._get_cached(('table', stock_id, table_type, sheet_name), lambda: self._store.read_table(stock_id, table_type, sheet_name))
+            tables.append({'sheet_name': sheet_name, 'records': records})
+        return {'stock_id': stock_id, 'table_type': table_type, 'tables': tables}
+
+    def get_metric(self, table_type: str, sheet_name: str, label: str, metric_name: str = '', column_no: int = 1) -> dict:
+        """
+        取得所有股票同一年度季別的會計項目數值或衍生數值
+
+        Arguments:
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱
+        label -- 會計項目
+
+        Keyword Arguments:
+        metric_name -- 衍生數值(quarter/ttm/qoq/yoy,空白=原始數值) (default: '')
+        column_no -- 原始數值的欄位 (default: 1)
+
+        Returns:
+        {table_type, sheet_name, label, metric, values: {股票代號: 數值}}
+        """
+        if metric_name != '':
+            values = self._get_cached(('metric', table_type, sheet_name, label, metric_name), lambda: self._metrics.get_period_metric(table_type, sheet_name, label, metric_name))
+        else:
+            values = self._get_cached(('values', table_type, sheet_name, label, column_no), lambda: self._store.get_values(table_type, sheet_name, label, column_no))
+        values = {stock_id: (None if value is None or math.isnan(value) else value) for stock_id, value in values.items()}
+        return {'table_type': table_type, 'sheet_name': sheet_name, 'label': label, 'metric': metric_name, 'values': values}
+
+    def _get_cached(self, key: tuple, load):
+        """
+        由LRU快取取得已解碼的資料(資料庫有其他連線寫入時清空快取)
+
+        Arguments:
+        key -- 快取鍵值
+        load -- 快取不存在時讀取資料庫的函式
+
+        Returns:
+        資料
+        """
+        with self._store_lock:
+            data_version = self._store.connection.execute('PRAGMA data_version').fetchone()[0]
+        with self._cache_lock:
+            if data_version != self._data_version:
+                self._cache.clear()
+                self._data_version = data_version
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._cache[key]
+            self.cache_misses += 1
+
+        with self._store_lock:
+            value = load()
+
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return value
@@ -0,0 +1,73 @@
+import unittest
+from cls_statement_server import ClsStatementServer
+from cls_statement_store import ClsStatementStore
+from urllib.request import urlopen
+from urllib.request import Request
+from urllib.error import HTTPError
+import json
+import threading
+
+
+class ClsStatementServerTest(unittest.TestCase):
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        self.statement_store = ClsStatementStore(':memory:')
+        for sheet_name, values in [('2018_03', ['1,000', '3,000']), ('2018_02', ['900', '2,000']), ('2018_01', ['800', '1,000'])]:
+            self.statement_store.write_table('1101', '台泥', '資產負債表', sheet_name, [['資產總額', values[0]]])
+            self.statement_store.write_table('2330', '台積電', '資產負債表', sheet_name, [['資產總額', values[1]]])
+        self.statement_server = ClsStatementServer(self.statement_store, cache_size=3)
+        self.http_server = self.statement_server.serve('127.0.0.1', 0)
+        self.url = 'http://127.0.0.1:' + str(self.http_server.server_address[1])
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+    # endregion
+
+    def _get(self, path: str):
+        with urlopen(self.url + path) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def test_statement(self):
+        result = self._get('/statement?stock_id=1101&table_type=%E8%B3%87%E7%94%A2%E8%B2%A0%E5%82%B5%E8%A1%A8&periods=2')
+        self.assertEqual([table['sheet_name'] for table in result['tables']], ['2018_03', '2018_02'])
+        self.assertEqual(result['tables'][0]['records'], [['資產總額', 1000.0]])
+
+        hits = self.statement_server.cache_hits
+        self._get('/statement?stock_id=1101&table_type=%E8%B3%87%E7%94%A2%E8%B2%A0%E5%82%B5%E8%A1%A8&periods=1')
+        self.assertEqual(self.statement_server.cache_hits, hits + 2)
+        self.assertLessEqual(len(self.statement_server._cache), 3)
+
+    def test_batch(self):
+        requests = [
+            {'path': '/metric', 'params': {'table_type': '資產負債表', 'sheet_name': '2018_03', 'label': '資產總額'}},
+            {'path': '/metric', 'params': {'table_type': '資產負債表'}},
+            'x',
+            {'path': '/statement', 'params': ['1101']},
+            {'path': '/statement', 'params': {'stock_id': '1101', 'table_type': '資產負債表', 'periods': ['8']}}]
+        request = Request(self.url + '/batch', data=json.dumps(requests).encode('utf-8'), method='POST')
+        with urlopen(request) as response:
+            results = json.loads(response.read().decode('utf-8'))
+        self.assertEqual(results[0], {'status': 200, 'result': {'table_type': '資產負債表', 'sheet_name': '2018_03', 'label': '資產總額', 'metric': '', 'values': {'1101': 1000.0, '2330': 3000.0}}})
+        self.assertEqual([result['status'] for result in results[1:]], [400, 400, 400, 400])
+
+        with self.assertRaises(HTTPError):
+            self._get('/unknown')
+
+
+if __name__ == '__main__':
+    tests = ['test_statement']
+    suite = unittest.TestSuite(map(ClsStatementServerTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
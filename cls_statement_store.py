@@ -0,0 +1,397 @@
+from cls_statement_table import ClsStatementTable
+import datetime
+import hashlib
+import json
+import math
+import re
+import sqlite3
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+
+class ClsStatementStore():
+    text_table_types = ['基本資料']
+
+    def __init__(self, database_path: str, shared: bool = False):
+        """
+        Arguments:
+        database_path -- 資料庫路徑
+
+        Keyword Arguments:
+        shared -- 是否由多台主機經網路磁碟共用(WAL不支援網路檔案系統,共用時改用預設的rollback journal) (default: False)
+        """
+        self.database_path = database_path
+        self._connection = sqlite3.connect(database_path, timeout=60, check_same_thread=False)
+        if shared:
+            self._connection.executescript('PRAGMA journal_mode = DELETE; PRAGMA synchronous = FULL;')
+        else:
+            self._connection.executescript('PRAGMA journal_mode = WAL; PRAGMA synchronous = NORMAL;')
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS stocks (
+                stock_id TEXT PRIMARY KEY,
+                stock_name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS statements (
+                stock_id TEXT NOT NULL,
+                table_type TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                row_no INTEGER NOT NULL,
+                column_no INTEGER NOT NULL,
+                label TEXT,
+                value REAL,
+                text TEXT,
+                PRIMARY KEY (stock_id, table_type, sheet_name, row_no, column_no)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS statements_label ON statements (table_type, sheet_name, label, column_no);
+            CREATE TABLE IF NOT EXISTS table_hashes (
+                stock_id TEXT NOT NULL,
+                table_type TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                checked_at TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                PRIMARY KEY (stock_id, table_type, sheet_name)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS snapshots (
+                content_hash TEXT PRIMARY KEY,
+                content TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS snapshot_history (
+                stock_id TEXT NOT NULL,
+                table_type TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                recorded_at TEXT NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS snapshot_history_table ON snapshot_history (stock_id, table_type, sheet_name, recorded_at);
+            CREATE TABLE IF NOT EXISTS derived_dirty (
+                stock_id TEXT NOT NULL,
+                table_type TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                UNIQUE (stock_id, table_type, sheet_name)
+            );
+            ''')
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        資料庫連線(供衍生資料快取共用同一資料庫)
+        """
+        return self._connection
+
+    def close(self):
+        """
+        關閉資料庫連線
+        """
+        self._connection.close()
+
+    def write_tables(self, tables: Iterable[Tuple[str, str, str, str, List[list]]]):
+        """
+        批次寫入表格(同一交易;同一股票/表格類型/工作表的舊資料會被取代),並標記為衍生資料需要重新計算
+
+        Arguments:
+        tables -- (股票代號,股票名稱,表格類型,工作表名稱,表格內容)列表
+        """
+        with self._connection:
+            for stock_id, stock_name, table_type, sheet_name, records in tables:
+                self._connection.execute('INSERT OR REPLACE INTO stocks (stock_id, stock_name) VALUES (?, ?)', (stock_id, stock_name))
+                self._connection.execute('DELETE FROM statements WHERE stock_id = ? AND table_type = ? AND sheet_name = ?', (stock_id, table_type, sheet_name))
+                self._connection.executemany('INSERT INTO statements VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self._to_cells(stock_id, table_type, sheet_name, records))
+                self._connection.execute('INSERT OR REPLACE INTO derived_dirty (stock_id, table_type, sheet_name) VALUES (?, ?, ?)', (stock_id, table_type, sheet_name))
+
+    def write_table(self, stock_id: str, stock_name: str, table_type: str, sheet_name: str, records: List[list]):
+        """
+        寫入表格(同一股票/表格類型/工作表的舊資料會被取代)
+
+        Arguments:
+        stock_id -- 股票代號
+        stock_name -- 股票名稱
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別,基本資料為空白)
+        records -- 表格內容
+        """
+        self.write_tables([(stock_id, stock_name, table_type, sheet_name, records)])
+
+    def _to_cells(self, stock_id: str, table_type: str, sheet_name: str, records: List[list]) -> Iterable[tuple]:
+        for row_no, record in enumerate(records):
+            label = record[0] if len(record) > 0 else None
+            for column_no, cell in enumerate(record):
+                value = self._to_value(table_type, column_no, cell)
+                if math.isnan(value):
+                    yield (stock_id, table_type, sheet_name, row_no, column_no, label, None, None if cell in ('', None) else str(cell))
+                else:
+                    yield (stock_id, table_type, sheet_name, row_no, column_no, label, value, None)
+
+    def _to_value(self, table_type: str, column_no: int, cell) -> float:
+        """
+        將儲存格轉為數值(會計項目欄/基本資料/0開頭的代號(ex: 統一編號,ETF代號)保留為文字,回傳NaN)
+        """
+        if column_no == 0 or table_type in self.text_table_types:
+            return math.nan
+        if isinstance(cell, str) and re.fullmatch(r'\s*0\d+\s*', cell):
+            return math.nan
+        return ClsStatementTable.to_number(cell)
+
+    def read_table(self, stock_id: str, table_type: str, sheet_name: str) -> List[List[Union[str, float, None]]]:
+        """
+        讀取表格(數值儲存格為float,其餘為文字)
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別,基本資料為空白)
+
+        Returns:
+        表格內容(不存在則為空)
+        """
+        records = list()
+
+        cursor = self._connection.execute('''
+            SELECT row_no, column_no, value, text FROM statements
+            WHERE stock_id = ? AND table_type = ? AND sheet_name = ?
+            ORDER BY row_no, column_no''', (stock_id, table_type, sheet_name))
+        current_row_no = None
+        for row_no, column_no, value, text in cursor:
+            if row_no != current_row_no:
+                current_row_no = row_no
+                records.append(list())
+            records[-1].extend([None] * (column_no - len(records[-1])))
+            records[-1].append(value if value is not None else text)
+
+        return records
+
+    def get_sheet_names(self, stock_id: str, table_type: str) -> List[str]:
+        """
+        取得已儲存的工作表名稱(新到舊)
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+
+        Returns:
+        工作表名稱列表
+        """
+        cursor = self._connection.execute('SELECT DISTINCT sheet_name FROM statements WHERE stock_id = ? AND table_type = ? ORDER BY sheet_name DESC', (stock_id, table_type))
+        return [row[0] for row in cursor]
+
+    def get_stocks(self) -> List[Tuple[str, str]]:
+        """
+        取得已儲存的股票
+
+        Returns:
+        (股票代號,股票名稱)列表
+        """
+        return self._connection.execute('SELECT stock_id, stock_name FROM stocks ORDER BY stock_id').fetchall()
+
+    def get_values(self, table_type: str, sheet_name: str, label: str, column_no: int = 1) -> dict:
+        """
+        取得所有股票同一會計項目的數值
+
+        Arguments:
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱
+        label -- 會計項目
+
+        Keyword Arguments:
+        column_no -- 欄位(0=會計項目) (default: 1)
+
+        Returns:
+        股票代號/數值對照
+        """
+        cursor = self._connection.execute('''
+            SELECT stock_id, value FROM statements
+            WHERE table_type = ? AND sheet_name = ? AND label = ? AND column_no = ?
+            ORDER BY stock_id, row_no''', (table_type, sheet_name, label, column_no))
+        values = dict()
+        for stock_id, value in cursor:
+            values.setdefault(stock_id, value)
+        return values
+
+    @staticmethod
+    def normalize_records(records: List[list]) -> List[List[str]]:
+        """
+        正規化表格內容(儲存格轉為去除空白的文字,移除列尾空白儲存格及空白列),網頁/Excel讀取的相同內容會得到相同結果
+
+        Arguments:
+        records -- 表格內容
+
+        Returns:
+        正規化的表格內容
+        """
+        normalized_records = list()
+
+        for record in records:
+            normalized_record = [' '.join(('' if cell is None else str(cell)).split()) for cell in record]
+            while normalized_record and normalized_record[-1] == '':
+                normalized_record.pop()
+            if normalized_record:
+                normalized_records.append(normalized_record)
+
+        return normalized_records
+
+    @staticmethod
+    def get_content_hash(records: List[list]) -> str:
+        """
+        取得正規化表格內容的雜湊值
+
+        Arguments:
+        records -- 表格內容
+
+        Returns:
+        SHA-256雜湊值
+        """
+        content = json.dumps(ClsStatementStore.normalize_records(records), ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get_table_hash(self, stock_id: str, table_type: str, sheet_name: str) -> str:
+        """
+        取得最後記錄的表格雜湊值
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別,基本資料為空白)
+
+        Returns:
+        雜湊值(未記錄則為None)
+        """
+        row = self._connection.execute('SELECT content_hash FROM table_hashes WHERE stock_id = ? AND table_type = ? AND sheet_name = ?', (stock_id, table_type, sheet_name)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_table_checks(self, stock_id: str, table_type: str) -> dict:
+        """
+        取得已記錄表格的雜湊值及最後檢查時間
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+
+        Returns:
+        工作表名稱/(雜湊值,檢查時間)對照
+        """
+        cursor = self._connection.execute('SELECT sheet_name, content_hash, checked_at FROM table_hashes WHERE stock_id = ? AND table_type = ?', (stock_id, table_type))
+        return {sheet_name: (content_hash, checked_at) for sheet_name, content_hash, checked_at in cursor}
+
+    def record_empty_table(self, stock_id: str, table_type: str, sheet_name: str, checked_at: str = None):
+        """
+        記錄取得的表格為空白(尚未申報): 不寫入表格,只記錄檢查時間;已有內容的表格不受影響
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別)
+
+        Keyword Arguments:
+        checked_at -- 檢查時間(None=現在,空白=未檢查(ex: 舊版本建立的空白工作表)) (default: None)
+        """
+        content_hash = self.get_content_hash([])
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        checked_at = now if checked_at is None else checked_at
+
+        table_hash = self.get_table_hash(stock_id, table_type, sheet_name)
+        with self._connection:
+            if table_hash is None:
+                self._connection.execute('INSERT INTO table_hashes (stock_id, table_type, sheet_name, content_hash, checked_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)', (stock_id, table_type, sheet_name, content_hash, checked_at, now))
+            elif table_hash == content_hash:
+                self._connection.execute('UPDATE table_hashes SET checked_at = ? WHERE stock_id = ? AND table_type = ? AND sheet_name = ?', (checked_at, stock_id, table_type, sheet_name))
+
+    def record_table(self, stock_id: str, stock_name: str, table_type: str, sheet_name: str, records: List[list], checked_at: str = None) -> bool:
+        """
+        記錄取得的表格: 雜湊值相同只更新檢查時間;不同才寫入表格及保存快照(相同內容的快照只存一份)
+
+        Arguments:
+        stock_id -- 股票代號
+        stock_name -- 股票名稱
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別,基本資料為空白)
+        records -- 表格內容
+
+        Keyword Arguments:
+        checked_at -- 檢查時間(None=現在,空白=未檢查(ex: 舊版本建立的工作表)) (default: None)
+
+        Returns:
+        內容是否變動(第1次記錄也視為變動)
+        """
+        content_hash = self.get_content_hash(records)
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        checked_at = now if checked_at is None else checked_at
+
+        if content_hash == self.get_table_hash(stock_id, table_type, sheet_name):
+            with self._connection:
+                self._connection.execute('UPDATE table_hashes SET checked_at = ? WHERE stock_id = ? AND table_type = ? AND sheet_name = ?', (checked_at, stock_id, table_type, sheet_name))
+            return False
+
+        self.write_table(stock_id, stock_name, table_type, sheet_name, records)
+        with self._connection:
+            self._connection.execute('INSERT OR IGNORE INTO snapshots (content_hash, content) VALUES (?, ?)', (content_hash, json.dumps(self.normalize_records(records), ensure_ascii=False)))
+            self._connection.execute('INSERT INTO snapshot_history (stock_id, table_type, sheet_name, recorded_at, content_hash) VALUES (?, ?, ?, ?, ?)', (stock_id, table_type, sheet_name, now, content_hash))
+            self._connection.execute('INSERT OR REPLACE INTO table_hashes (stock_id, table_type, sheet_name, content_hash, checked_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)', (stock_id, table_type, sheet_name, content_hash, checked_at, now))
+        return True
+
+    def get_snapshots(self, stock_id: str, table_type: str, sheet_name: str) -> List[Tuple[str, List[List[str]]]]:
+        """
+        取得表格的歷史快照(舊到新)
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別,基本資料為空白)
+
+        Returns:
+        (記錄時間,正規化的表格內容)列表
+        """
+        cursor = self._connection.execute('''
+            SELECT snapshot_history.recorded_at, snapshots.content FROM snapshot_history
+            JOIN snapshots ON snapshots.content_hash = snapshot_history.content_hash
+            WHERE stock_id = ? AND table_type = ? AND sheet_name = ?
+            ORDER BY recorded_at, rowid''', (stock_id, table_type, sheet_name))
+        return [(recorded_at, json.loads(content)) for recorded_at, content in cursor]
+
+    def get_changes(self, stock_id: str, table_type: str, sheet_name: str) -> List[Tuple[str, str, str, str]]:
+        """
+        比對相鄰快照,取得變動的項目(ex: 基本資料的董事長異動,重編的財報項目)
+
+        Arguments:
+        stock_id -- 股票代號
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(年度季別,基本資料為空白)
+
+        Returns:
+        (記錄時間,項目,舊值,新值)列表
+        """
+        changes = list()
+
+        snapshots = self.get_snapshots(stock_id, table_type, sheet_name)
+        for (_, old_records), (recorded_at, new_records) in zip(snapshots, snapshots[1:]):
+            old_values = dict()
+            for record in old_records:
+                old_values.setdefault(record[0], ','.join(record[1:]))
+            new_values = dict()
+            for record in new_records:
+                new_values.setdefault(record[0], ','.join(record[1:]))
+            for label in list(new_values) + [label for label in old_values if label not in new_values]:
+                if old_values.get(label) != new_values.get(label):
+                    changes.append((recorded_at, label, old_values.get(label), new_values.get(label)))
+
+        return changes
+
+    def get_recent_changes(self, since: str = '') -> List[Tuple[str, str, str, str]]:
+        """
+        取得所有表格最近的內容變動(重編的財報/基本資料異動;第1次取得或前一次為空白不算變動)
+
+        Keyword Arguments:
+        since -- 只取得此時間(ISO格式)之後的變動(空白=全部) (default: '')
+
+        Returns:
+        (記錄時間,股票代號,表格類型,工作表名稱)列表(新到舊)
+        """
+        cursor = self._connection.execute('''
+            SELECT recorded_at, stock_id, table_type, sheet_name FROM snapshot_history AS current
+            WHERE recorded_at >= ? AND EXISTS (
+                SELECT 1 FROM snapshot_history AS previous
+                WHERE previous.stock_id = current.stock_id AND previous.table_type = current.table_type AND previous.sheet_name = current.sheet_name
+                AND previous.rowid < current.rowid AND previous.content_hash != ?)
+            ORDER BY recorded_at DESC, rowid DESC''', (since, self.get_content_hash([])))
+        return cursor.fetchall()
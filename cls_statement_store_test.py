@@ -0,0 +1,78 @@
+import unittest
+from cls_statement_store import ClsStatementStore
+import tempfile
+import os
+
+
+class ClsStatementStoreTest(unittest.TestCase):
+    database_path = tempfile.gettempdir() + os.sep + 'statement_store_test.db'
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.isfile(self.database_path + suffix):
+                os.remove(self.database_path + suffix)
+        self.statement_store = ClsStatementStore(self.database_path)
+
+    def tearDown(self):
+        self.statement_store.close()
+    # endregion
+
+    def test_write_table(self):
+        self.statement_store.write_table('1101', '台泥', '資產負債表', '2018_03', [['資產總額', '1,000', '100.00'], ['流動資產'], ['負債總額', '(200)', '']])
+        self.assertEqual(self.statement_store.read_table('1101', '資產負債表', '2018_03'), [['資產總額', 1000.0, 100.0], ['流動資產'], ['負債總額', -200.0, None]])
+
+        self.statement_store.write_table('1101', '台泥', '資產負債表', '2018_03', [['資產總額', '2,000']])
+        self.assertEqual(self.statement_store.read_table('1101', '資產負債表', '2018_03'), [['資產總額', 2000.0]])
+        self.assertEqual(self.statement_store.get_stocks(), [('1101', '台泥')])
+
+        self.statement_store.write_table('1101', '台泥', '基本資料', '', [['營利事業統一編號', '04541302'], ['實收資本額(元)', '1,000']])
+        self.assertEqual(self.statement_store.read_table('1101', '基本資料', ''), [['營利事業統一編號', '04541302'], ['實收資本額(元)', '1,000']])
+        self.statement_store.write_table('0050', '元大台灣50', '股利分配', '2018_00', [['證券代號', '0050', '100']])
+        self.assertEqual(self.statement_store.read_table('0050', '股利分配', '2018_00'), [['證券代號', '0050', 100.0]])
+
+    def test_get_values(self):
+        self.statement_store.write_tables([
+            ('1101', '台泥', '資產負債表', '2018_03', [['資產總額', '1,000']]),
+            ('1102', '亞泥', '資產負債表', '2018_03', [['資產總額', '3,000']]),
+            ('1102', '亞泥', '資產負債表', '2018_02', [['資產總額', '2,000']])])
+        self.assertEqual(self.statement_store.get_values('資產負債表', '2018_03', '資產總額'), {'1101': 1000.0, '1102': 3000.0})
+        self.assertEqual(self.statement_store.get_sheet_names('1102', '資產負債表'), ['2018_03', '2018_02'])
+
+    def test_record_table(self):
+        self.assertTrue(self.statement_store.record_table('1101', '台泥', '基本資料', '', [['董事長', '辜成允'], ['總經理', '李鐘培']]))
+        self.assertFalse(self.statement_store.record_table('1101', '台泥', '基本資料', '', [['董事長', ' 辜成允 ', None], ['總經理', '李鐘培'], []]))
+        self.assertTrue(self.statement_store.record_table('1101', '台泥', '基本資料', '', [['董事長', '張安平'], ['總經理', '李鐘培']]))
+        self.assertTrue(self.statement_store.record_table('1101', '台泥', '基本資料', '', [['董事長', '辜成允'], ['總經理', '李鐘培']]))
+
+        self.assertEqual(len(self.statement_store.get_snapshots('1101', '基本資料', '')), 3)
+        self.assertEqual(self.statement_store.connection.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0], 2)
+        self.assertEqual([change[1:] for change in self.statement_store.get_changes('1101', '基本資料', '')], [('董事長', '辜成允', '張安平'), ('董事長', '張安平', '辜成允')])
+        self.assertEqual(self.statement_store.read_table('1101', '基本資料', ''), [['董事長', '辜成允'], ['總經理', '李鐘培']])
+
+    def test_get_recent_changes(self):
+        self.statement_store.record_table('1101', '台泥', '綜合損益表', '2018_01', [])
+        self.statement_store.record_table('1101', '台泥', '綜合損益表', '2018_01', [['營業收入', '100']])
+        self.statement_store.record_table('1101', '台泥', '綜合損益表', '2018_02', [['營業收入', '200']])
+        self.assertEqual(self.statement_store.get_recent_changes(), [])
+
+        self.statement_store.record_table('1101', '台泥', '綜合損益表', '2018_01', [['營業收入', '90']])
+        self.assertEqual([change[1:] for change in self.statement_store.get_recent_changes()], [('1101', '綜合損益表', '2018_01')])
+        self.assertEqual(self.statement_store.get_recent_changes('9999'), [])
+
+
+if __name__ == '__main__':
+    tests = ['test_write_table']
+    suite = unittest.TestSuite(map(ClsStatementStoreTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
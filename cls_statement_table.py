@@ -0,0 +1,162 @@
+from array import array
+from typing import List
+from typing import Union
+import math
+
+
+class ClsStatementTable():
+    __slots__ = ('_label_ids', '_values', '_texts', 'column_count')
+
+    _label_indexes = dict()
+    _label_names = list()
+
+    def __init__(self, column_count: int):
+        self._label_ids = array('I')
+        self._values = array('d')
+        self._texts = None
+        self.column_count = column_count
+
+    @classmethod
+    def from_records(cls, records: List[List[str]]) -> 'ClsStatementTable':
+        """
+        由get_statment_table取得的表格內容建立
+
+        Arguments:
+        records -- 表格內容(每列第1欄為會計項目)
+
+        Returns:
+        精簡表格
+        """
+        table = cls(max((len(record) for record in records), default=1) - 1)
+
+        for record in records:
+            if len(record) == 0:
+                continue
+            table.append(record[0], record[1:])
+
+        return table
+
+    @classmethod
+    def _get_label_id(cls, label: str) -> int:
+        """
+        取得會計項目編號(所有表格共用同一份會計項目名稱)
+
+        Arguments:
+        label -- 會計項目
+
+        Returns:
+        會計項目編號
+        """
+        label_id = cls._label_indexes.get(label)
+        if label_id is None:
+            label_id = len(cls._label_names)
+            cls._label_names.append(label)
+            cls._label_indexes[label] = label_id
+        return label_id
+
+    @staticmethod
+    def to_number(text: str) -> float:
+        """
+        將儲存格文字轉換為數值(千分位/括號負數/百分比,無法轉換則為NaN)
+
+        Arguments:
+        text -- 儲存格文字
+
+        Returns:
+        數值
+        """
+        if text is None:
+            return math.nan
+        if not isinstance(text, str):
+            return float(text)
+
+        text = text.strip().replace(',', '').rstrip('%')
+        if text.startswith('(') and text.endswith(')'):
+            text = '-' + text[1:-1]
+        try:
+            return float(text)
+        except ValueError:
+            return math.nan
+
+    def append(self, label: str, cells: List[str]):
+        """
+        新增一列
+
+        Arguments:
+        label -- 會計項目
+        cells -- 其餘儲存格文字
+        """
+        row_index = len(self._label_ids)
+        self._label_ids.append(self._get_label_id(label))
+
+        for column_index in range(self.column_count):
+            cell = cells[column_index] if column_index < len(cells) else ''
+            value = self.to_number(cell)
+            self._values.append(value)
+            if math.isnan(value) and cell not in ('', None):
+                if self._texts is None:
+                    self._texts = dict()
+                self._texts[(row_index, column_index)] = cell
+
+    def __len__(self) -> int:
+        return len(self._label_ids)
+
+    @property
+    def labels(self) -> List[str]:
+        return [self._label_names[label_id] for label_id in self._label_ids]
+
+    def get_row(self, label: str) -> List[float]:
+        """
+        取得會計項目第1次出現的數值列
+
+        Arguments:
+        label -- 會計項目
+
+        Returns:
+        數值列(會計項目不存在則為None)
+        """
+        label_id = self._label_indexes.get(label)
+        if label_id is None:
+            return None
+
+        for row_index, row_label_id in enumerate(self._label_ids):
+            if row_label_id == label_id:
+                return self._values[row_index * self.column_count:(row_index + 1) * self.column_count].tolist()
+
+        return None
+
+    def get_value(self, label: str, column_index: int = 0) -> float:
+        """
+        取得會計項目的數值
+
+        Arguments:
+        label -- 會計項目
+
+        Keyword Arguments:
+        column_index -- 數值欄位(不含會計項目) (default: 0)
+
+        Returns:
+        數值(不存在或非數值則為NaN)
+        """
+        row = self.get_row(label)
+        return row[column_index] if row is not None and column_index < len(row) else math.nan
+
+    def to_records(self) -> List[List[Union[str, float]]]:
+        """
+        轉換回列表(非數值儲存格保留文字,空白儲存格為None)
+
+        Returns:
+        表格內容
+        """
+        records = list()
+
+        for row_index, label_id in enumerate(self._label_ids):
+            record = [self._label_names[label_id]]
+            for column_index in range(self.column_count):
+                value = self._values[row_index * self.column_count + column_index]
+                if math.isnan(value):
+                    value = self._texts.get((row_index, column_index)) if self._texts else None
+                record.append(value)
+            records.append(record)
+
+        return records
@@ -0,0 +1,58 @@
+from cls_statement_table import ClsStatementTable
+import random
+import tracemalloc
+import gc
+
+
+def make_market_records(stock_count: int, table_shapes: dict, label_count: int):
+    """
+    產生模擬整個巿場一季的表格內容(每個儲存格都是新配置的字串,與解析網頁時相同)
+
+    Arguments:
+    stock_count -- 股票數量
+    table_shapes -- 表格類型/(列數,數值欄數)對照
+    label_count -- 會計項目種類數量
+
+    Returns:
+    表格內容產生器
+    """
+    labels = ['流動資產合計', '非流動資產合計', '資產總額', '流動負債合計', '負債總額', '權益總額', '營業收入合計', '營業毛利(毛損)', '稅前淨利(淨損)', '本期淨利(淨損)']
+    labels += ['會計項目{0:03d}'.format(index) for index in range(label_count - len(labels))]
+    random_generator = random.Random(0)
+
+    for stock_index in range(stock_count):
+        for table_type, (row_count, column_count) in table_shapes.items():
+            records = list()
+            for label in random_generator.sample(labels, row_count):
+                record = [''.join(list(label))]
+                for column_index in range(column_count):
+                    if column_index % 2 == 1:
+                        record.append('{0:.2f}'.format(random_generator.uniform(0, 100)))
+                    else:
+                        record.append('{0:,}'.format(random_generator.randint(-10 ** 9, 10 ** 10)))
+                records.append(record)
+            yield records
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    tables = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tables
+    return current
+
+
+if __name__ == '__main__':
+    stock_count = 950
+    table_shapes = {'資產負債表': (80, 2), '綜合損益表': (60, 2), '現金流量表': (90, 1)}
+    label_count = 400
+
+    list_bytes = measure(lambda: list(make_market_records(stock_count, table_shapes, label_count)))
+    compact_bytes = measure(lambda: [ClsStatementTable.from_records(records) for records in make_market_records(stock_count, table_shapes, label_count)])
+
+    print('股票數量: {0}, 表格數量: {1}'.format(stock_count, stock_count * len(table_shapes)))
+    print('list[list[str]]:   {0:10.1f} MB'.format(list_bytes / 1024 / 1024))
+    print('ClsStatementTable: {0:10.1f} MB'.format(compact_bytes / 1024 / 1024))
+    print('節省比例:          {0:10.1%}'.format(1 - compact_bytes / list_bytes))
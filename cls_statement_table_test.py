@@ -0,0 +1,49 @@
+import unittest
+from cls_statement_table import ClsStatementTable
+import math
+
+
+class ClsStatementTableTest(unittest.TestCase):
+    records = [['流動資產合計', '1,234,567', '12.34'], ['資產總額', '(2,000)', ''], ['會計師姓名', '王大明']]
+
+    # region 初始方法
+    def __init__(self, *args, **kwargs):
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    @classmethod
+    def setUpClass(self):
+        pass
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+    # endregion
+
+    def test_from_records(self):
+        table = ClsStatementTable.from_records(self.records)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.column_count, 2)
+        self.assertEqual(table.labels, ['流動資產合計', '資產總額', '會計師姓名'])
+        self.assertEqual(table.get_row('流動資產合計'), [1234567.0, 12.34])
+        self.assertEqual(table.get_value('資產總額'), -2000.0)
+        self.assertTrue(math.isnan(table.get_value('資產總額', 1)))
+        self.assertTrue(math.isnan(table.get_value('不存在的項目')))
+        self.assertEqual(table.to_records(), [['流動資產合計', 1234567.0, 12.34], ['資產總額', -2000.0, None], ['會計師姓名', '王大明', None]])
+
+    def test_shared_labels(self):
+        first_table = ClsStatementTable.from_records([[''.join(['資產', '總額']), '1']])
+        second_table = ClsStatementTable.from_records([[''.join(['資產', '總額']), '2']])
+        self.assertIs(first_table.labels[0], second_table.labels[0])
+        self.assertFalse(hasattr(first_table, '__dict__'))
+
+
+if __name__ == '__main__':
+    tests = ['test_from_records']
+    suite = unittest.TestSuite(map(ClsStatementTableTest, tests))
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -1,9 +1,12 @@
 from cls_excel_handler import ClsExcelHandler
+from cls_statement_store import ClsStatementStore
+from cls_derived_metrics import ClsDerivedMetrics
 
 
 class ClsStockComparer():
-    def __init__(self):
+    def __init__(self, store: ClsStatementStore = None):
         self._excel = ClsExcelHandler()
+        self.metrics = ClsDerivedMetrics(store) if store is not None else None
 
     def get_ebit(self, parameter_list):
         pass
@@ -1,6 +1,14 @@
 from cls_webpage_fetcher import ClsWebpageFetcher
 from cls_excel_handler import ClsExcelHandler
+from cls_crawl_coordinator import ClsCrawlCoordinator
+from cls_statement_table import ClsStatementTable
+from cls_statement_store import ClsStatementStore
+from cls_statement_exporter import ClsStatementExporter
+from cls_job_scheduler import ClsJobScheduler
+from cls_crawl_pipeline import ClsCrawlPipeline
+from cls_catalog_cache import ClsCatalogCache
 import datetime
+import threading
 from lxml import etree
 from typing import List
 from typing import Union
@@ -11,12 +19,19 @@ from win10toast import ToastNotifier
 
 
 class ClsTaiwanStock():
+    statment_table_types = ['資產負債表', '綜合損益表', '現金流量表', '權益變動表', '財報附註', '股利分配', '會計報告']
+
     def __init__(self):
         self._fetcher = ClsWebpageFetcher()
         self._excel = ClsExcelHandler()
         self._current_process_count: int = 0
         self._total_process_count: int = 0
         self.books_path: str = ''
+        self._store: ClsStatementStore = None
+        self._catalog: ClsCatalogCache = None
+        self.shared_store: bool = False
+        self.scheduler = ClsJobScheduler()
+        self.pipeline: ClsCrawlPipeline = None
         self.notifier = ToastNotifier()
 
     def main(self):
@@ -25,126 +40,307 @@ class ClsTaiwanStock():
             if config.action == 'Submit':
                 self.books_path = config.drive_letter + ':\\' + config.directory_name
                 self._excel.open_books_directory(self.books_path)
-                self.get_stock_files(config)
+                if config.sync_mode:
+                    self.sync_stock_files(config)
+                else:
+                    self.get_stock_files(config)
                 self.notifier.show_toast('Stock Statments', '建立完成')
             else:
                 self.show_popup('取消建立!')
         except ValueError as ex:
             gui.Popup(ex)
 
+    def open_books_directory(self, books_path: str):
+        """
+        設定Excel存放路徑(不存在則先建立)
+
+        Arguments:
+        books_path -- 本機路徑
+        """
+        self.books_path = books_path
+        self._excel.open_books_directory(self.books_path)
+
+    def sync(self, books_path: str, time_budget_minutes: str = ''):
+        """
+        不開啟設定介面直接執行增量同步(供排程每日執行)
+
+        Arguments:
+        books_path -- 本機路徑
+
+        Keyword Arguments:
+        time_budget_minutes -- 執行時間上限分鐘數(空白=不限) (default: '')
+        """
+        config = NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str), ('sync_mode', bool), ('watchlist', str), ('time_budget_minutes', str)])
+        config.action = 'Submit'
+        config.start_stock_id = ''
+        config.finish_stock_id = ''
+        config.start_season = ''
+        config.finish_season = ''
+        config.sync_mode = True
+        config.watchlist = ','.join(self.scheduler.watchlist)
+        config.time_budget_minutes = time_budget_minutes
+
+        self.open_books_directory(books_path)
+        self.sync_stock_files(config)
+        self.notifier.show_toast('Stock Statments', '同步完成')
+
     def show_current_process(function):
         @wraps(function)
         def wrapper(self, *args, **kwargs):
             func = function(self, *args, **kwargs)
-            self._current_process_count += 1
+            self.add_progress()
             self.notifier.show_toast('Stock Statments', '完成進度:' + str(round((self._current_process_count / self._total_process_count * 100), 2)) + '%', duration=1)
             return func
         return wrapper
 
     @show_current_process
-    def get_basic_info_files(self, stock: NamedTuple('stock', [('id', str), ('name', str)])):
+    def get_basic_info_files(self, stock: NamedTuple('stock', [('id', str), ('name', str)]), refresh: bool = False):
         """
         取得台股上巿股票基本資料檔案
 
         Arguments:
         stock -- 股票代號/名稱
+
+        Keyword Arguments:
+        refresh -- 檔案已存在時是否重新取得 (default: False)
         """
-        def get_basic_info() -> List[List[str]]:
-            """
-                取得台股上巿股票基本資料
-
-                Returns:
-                基本資料
-                """
-            basic_info = dict()
-
-            html = self._fetcher.download_html('http://mops.twse.com.tw/mops/web/t05st03', 'post', 'firstin=1&co_id=' + stock.id)
-
-            title = ''
-            rows = self._fetcher.find_elements(html, '//table[@class="hasBorder"]//tr')
-            for row in rows:
-                if (row[0].text.strip() == '本公司'):
-                    basic_info[row[2].text.strip()] = row[1].text.strip()
-                    basic_info[row[5].text.strip()] = row[4].text.strip()
-                if (row[0].text.strip() == '本公司採'):
-                    basic_info['會計年度月制(現)'] = row[1].text.strip()
-                if (row[0].text.strip() == '本公司於'):
-                    basic_info['會計年度月制(前)'] = row[3].text.strip()
-                    basic_info['會計年度月制轉換'] = row[1].text.strip()
-                if (row[0].text.strip() == '編製財務報告類型'):
-                    report_type = row[1].text.strip()
-                    basic_info[row[0].text.strip()] = report_type[1:3] if report_type[0] == '●' else report_type[4:6]
-                else:
-                    for index, cell in enumerate(row, start=1):
-                        if (index % 2 == 1):
-                            if (cell.tag == 'th'):
-                                title = cell.text.strip()
-                                basic_info[title] = ''
-                        else:
-                            if (cell.tag == 'td'):
-                                basic_info[title] = cell.text.strip()
-            basic_info_list = self._to_list(basic_info)
-
-            return basic_info_list
-
-        book_path = self.books_path + '\\' + stock.id + '(' + stock.name + ')_基本資料' + '.xlsx'
-        if not self._excel.is_book_existed(book_path):
+        book_path = self._get_book_path(stock, '基本資料')
+        if not self._excel.is_book_existed(book_path) or refresh:
             self._fetcher.wait(30, 35)
-            self._excel.open_book(book_path)
-            basic_info = get_basic_info()
-            self._excel.write_to_sheet(basic_info)
-            self._excel.save_book(book_path)
+            basic_info = self.get_basic_info(stock)
+            self._save_basic_info(self._excel, stock, basic_info)
+
+    def get_basic_info(self, stock: NamedTuple('stock', [('id', str), ('name', str)])) -> List[List[str]]:
+        """
+        取得台股上巿股票基本資料
+
+        Arguments:
+        stock -- 股票代號/名稱
+
+        Returns:
+        基本資料
+        """
+        request = self._get_basic_info_request(stock)
+        html = self._fetcher.download_html(request.url, 'post', request.data)
+        return self._parse_basic_info(html, request)
+
+    def _get_basic_info_request(self, stock: NamedTuple('stock', [('id', str), ('name', str)])) -> NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)]):
+        request = NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)])
+        request.url = 'http://mops.twse.com.tw/mops/web/t05st03'
+        request.data = 'firstin=1&co_id=' + stock.id
+        request.row_xpath = '//table[@class="hasBorder"]//tr'
+        request.cell_xpath = './*'
+        return request
+
+    def _parse_basic_info(self, html: etree.HTML, request: NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)])) -> List[List[str]]:
+        basic_info = dict()
+
+        title = ''
+        rows = self._fetcher.find_elements(html, request.row_xpath)
+        for row in rows:
+            cells = row.xpath(request.cell_xpath)
+            if (cells[0].text.strip() == '本公司'):
+                basic_info[cells[2].text.strip()] = cells[1].text.strip()
+                basic_info[cells[5].text.strip()] = cells[4].text.strip()
+            if (cells[0].text.strip() == '本公司採'):
+                basic_info['會計年度月制(現)'] = cells[1].text.strip()
+            if (cells[0].text.strip() == '本公司於'):
+                basic_info['會計年度月制(前)'] = cells[3].text.strip()
+                basic_info['會計年度月制轉換'] = cells[1].text.strip()
+            if (cells[0].text.strip() == '編製財務報告類型'):
+                report_type = cells[1].text.strip()
+                basic_info[cells[0].text.strip()] = report_type[1:3] if report_type[0] == '●' else report_type[4:6]
+            else:
+                for index, cell in enumerate(cells, start=1):
+                    if (index % 2 == 1):
+                        if (cell.tag == 'th'):
+                            title = cell.text.strip()
+                            basic_info[title] = ''
+                    else:
+                        if (cell.tag == 'td'):
+                            basic_info[title] = cell.text.strip()
+        basic_info_list = self._to_list(basic_info)
+
+        return basic_info_list
+
+    def _save_basic_info(self, excel: ClsExcelHandler, stock: NamedTuple('stock', [('id', str), ('name', str)]), basic_info: List[List[str]]):
+        """
+        檔案不存在或內容變動才寫入Excel檔案,寫入成功後才記錄雜湊值(存檔失敗下次仍會視為變動)
+
+        Arguments:
+        excel -- Excel處理物件
+        stock -- 股票代號/名稱
+        basic_info -- 基本資料
+        """
+        book_path = self._get_book_path(stock, '基本資料')
+        book_existed = excel.is_book_existed(book_path)
+        if book_existed and self._get_store().get_table_hash(stock.id, '基本資料', '') is None:
+            excel.open_book(book_path)
+            self._get_store().record_table(stock.id, stock.name, '基本資料', '', excel.get_sheet_values())
+        previous_hash = self._get_store().get_table_hash(stock.id, '基本資料', '')
+        changed = self._get_store().get_content_hash(basic_info) != previous_hash
+        if not book_existed or changed:
+            excel.create_book()
+            excel.write_to_sheet(basic_info)
+            excel.save_book(book_path)
+        if self._get_store().record_table(stock.id, stock.name, '基本資料', '', basic_info):
+            self._notify_change(stock, '基本資料', '', previous_hash)
 
     def get_stock_list(self, start_stock_id: str, finish_stock_id: str) -> List[NamedTuple('stock', [('id', str), ('name', str)])]:
         """
-        取得台股上巿股票代號/名稱列表
+        取得台股上巿股票代號/名稱列表(使用本機快照,每日最多重新驗證1次)
 
         Returns:
         股票代號/名稱列表
         """
         stock_list = list()
 
-        html = self._fetcher.download_html('http://www.twse.com.tw/zh/stockSearch/stockSearch')
-
-        stock_items = self._fetcher.find_elements(html, '//table[@class="grid"]//a/text()')
-        for stock_item in stock_items:
+        stock_items = self._get_catalog().get_catalog('stocks', 'http://www.twse.com.tw/zh/stockSearch/stockSearch', self._parse_stock_items)
+        for stock_id, stock_name in stock_items:
             stock = NamedTuple('stock', [('id', str), ('name', str)])
-            stock.id = stock_item[0:4]
-            stock.name = stock_item[4:]
+            stock.id = stock_id
+            stock.name = stock_name
             if stock.id >= (start_stock_id if start_stock_id != '' else '0000') and stock.id <= (finish_stock_id if finish_stock_id != '' else '9999'):
                 stock_list.append(stock)
         return stock_list
 
-    def _get_periods(self, start_season: str, finish_season: str) -> List[NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])]:
-        html = self._fetcher.download_html('http://mops.twse.com.tw/server-java/t164sb01')
+    def _parse_stock_items(self, text: str) -> List[List[str]]:
+        html = etree.HTML(text)
+        stock_items = self._fetcher.find_elements(html, '//table[@class="grid"]//a/text()')
+        return [[stock_item[0:4], stock_item[4:]] for stock_item in stock_items]
+
+    def get_stock_history(self, stock_id: str = '') -> List[tuple]:
+        """
+        取得股票上巿/下巿/更名記錄
+
+        Keyword Arguments:
+        stock_id -- 股票代號(空白=全部) (default: '')
+
+        Returns:
+        (記錄時間,股票代號,股票名稱,listed/delisted/renamed)列表
+        """
+        return self._get_catalog().get_history('stocks', stock_id)
 
-        years = self._fetcher.find_elements(html, '//select[@id="SYEAR"]//option/@value')
+    def _get_catalog(self) -> ClsCatalogCache:
+        """
+        取得參考目錄快取(與表格資料共用資料庫;未指定本機路徑時只存於記憶體)
+
+        Returns:
+        參考目錄快取
+        """
+        if self._catalog is None:
+            store = self._get_store() if self.books_path != '' else ClsStatementStore(':memory:')
+            self._catalog = ClsCatalogCache(store, self._fetcher)
+        return self._catalog
+
+    def _get_filing_deadlines(self, ad_year: str) -> dict:
+        """
+        取得該年度各季財報申報期限
+
+        Arguments:
+        ad_year -- 西元年度
+
+        Returns:
+        季別/申報期限對照
+        """
+        return {
+            '01': datetime.datetime(int(ad_year), 5, 15),
+            '02': datetime.datetime(int(ad_year), 8, 14),
+            '03': datetime.datetime(int(ad_year), 11, 14),
+            '04': datetime.datetime(int(ad_year) + 1, 3, 31)
+        }
+
+    def _get_periods(self, start_season: str, finish_season: str) -> List[NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])]:
+        years = [item[0] for item in self._get_catalog().get_catalog('years', 'http://mops.twse.com.tw/server-java/t164sb01', self._parse_period_years)]
         current_year = datetime.datetime.now().year
 
         periods = list()
 
         for year in reversed(years):
             if int(year) <= current_year:
-                first_season_date = datetime.datetime(int(year), 5, 15)
-                second_season_date = datetime.datetime(int(year), 8, 14)
-                third_season_date = datetime.datetime(int(year), 11, 14)
-                fourth_season_date = datetime.datetime(int(year) + 1, 3, 31)
+                filing_deadlines = self._get_filing_deadlines(year)
 
                 for season in reversed(['01', '02', '03', '04']):
-                        if ((season == '01' and datetime.datetime.now() > first_season_date) or
-                                (season == '02' and datetime.datetime.now() > second_season_date) or
-                                (season == '03' and datetime.datetime.now() > third_season_date) or
-                                (season == '04' and datetime.datetime.now() > fourth_season_date)):
-                            period = NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])
-                            period.ad_year = year
-                            period.roc_year = str(int(year) - 1911)
-                            period.season = season
-                            periods.append(period)
+                        if datetime.datetime.now() > filing_deadlines[season]:
+                            periods.append(self.to_period(year, season))
 
         return periods[int((start_season if start_season != '' else '1')) - 1:int(finish_season if finish_season != '' else str(len(periods)))]
 
+    def _parse_period_years(self, text: str) -> List[List[str]]:
+        html = etree.HTML(text)
+        return [[str(year)] for year in self._fetcher.find_elements(html, '//select[@id="SYEAR"]//option/@value')]
+
+    def _get_revisit_periods(self, revisit_days: int) -> List[NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])]:
+        """
+        取得申報期限已過n天內的年度季別(可能逾期申報/更正)
+
+        Arguments:
+        revisit_days -- 申報期限後天數
+
+        Returns:
+        年度季別列表(新到舊)
+        """
+        now = datetime.datetime.now()
+        periods = list()
+
+        for year in [str(now.year), str(now.year - 1)]:
+            filing_deadlines = self._get_filing_deadlines(year)
+            for season in reversed(['01', '02', '03', '04']):
+                if now > filing_deadlines[season] and (now - filing_deadlines[season]).days <= revisit_days:
+                    periods.append(self.to_period(year, season))
+
+        return periods
+
+    def _get_period_deadline(self, period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])) -> datetime.datetime:
+        """
+        取得年度季別的申報期限(年度資料(季別00)為已過期限的最新一季,都未過則為第1季)
+
+        Arguments:
+        period -- 年度季別
+
+        Returns:
+        申報期限
+        """
+        filing_deadlines = self._get_filing_deadlines(period.ad_year)
+        if period.season != '00':
+            return filing_deadlines[period.season]
+        passed_deadlines = [deadline for deadline in filing_deadlines.values() if deadline < datetime.datetime.now()]
+        return max(passed_deadlines) if passed_deadlines else filing_deadlines['01']
+
+    def get_latest_period(self) -> NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]):
+        """
+        取得已過申報期限的最新年度季別(不需下載網頁)
+
+        Returns:
+        年度季別
+        """
+        now = datetime.datetime.now()
+
+        for year in [str(now.year), str(now.year - 1), str(now.year - 2)]:
+            filing_deadlines = self._get_filing_deadlines(year)
+            for season in reversed(['01', '02', '03', '04']):
+                if now > filing_deadlines[season]:
+                    return self.to_period(year, season)
+
+    def to_period(self, ad_year: str, season: str) -> NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]):
+        """
+        建立年度季別
+
+        Arguments:
+        ad_year -- 西元年
+        season -- 季別(01~04,財務分析為00)
+
+        Returns:
+        年度季別
+        """
+        period = NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])
+        period.ad_year = ad_year
+        period.roc_year = str(int(ad_year) - 1911)
+        period.season = season
+        return period
+
     @show_current_process
-    def get_statment_file(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])):
+    def get_statment_file(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]), refresh: bool = False):
         """
         取得財務狀況Excel檔案
 
@@ -152,82 +348,200 @@ class ClsTaiwanStock():
         table_type -- 表格類型(資產負債表/綜合損益表/權益變動表/現金流量表/財報附註/財務分析/股利分配/會計報告)
         stock -- 股票代碼
         period -- 年度季別
+
+        Keyword Arguments:
+        refresh -- 工作表已存在時是否重新取得 (default: False)
         """
 
-        def get_statment_table() -> List[str]:
-            """
-            取得表格內容
-
-            Returns:
-            表格內容
-            """
-            if table_type == '資產負債表':
-                row_xpath = '//table[@class="hasBorder"]//tr[not(th)]'
-                cell_xpath = './td[position() <= 3]'
-                url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb03'
-                data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
-            elif table_type == '綜合損益表':
-                row_xpath = '//table[@class="hasBorder"]//tr[not(th)]'
-                cell_xpath = './td[position() <= 3]'
-                url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb04'
-                data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
-            elif table_type == '現金流量表':
-                row_xpath = '//table[@class="hasBorder"]//tr[not(th)]'
-                cell_xpath = './td[position() <= 2]'
-                url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb05'
-                data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
-            elif table_type == '權益變動表':
-                row_xpath = '//table[@class="hasBorder" and position() = 2]//tr[position() >=3]'
-                cell_xpath = './*'
-                url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb06'
-                data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
-            elif table_type == '財報附註':
-                row_xpath = '//table[@class="main_table hasBorder" and contains(., "財報附註")]//tr[position() >= 2]'
-                cell_xpath = './td'
-                url = 'http://mops.twse.com.tw/server-java/t164sb01'
-                data = 'step=1&CO_ID={0}&SYEAR={1}&SSEASON={2}&REPORT_ID=C'.format(stock.id, period.ad_year, period.season.replace("0", ""))
-            elif table_type == '財務分析':
-                row_xpath = '//table[@style = "width:90%;"]//tr[position() >= 2]'
-                cell_xpath = './th[@style = "text-align:left !important;"] | ./td[position() = 3]'
-                url = 'http://mops.twse.com.tw/mops/web/ajax_t05st22'
-                data = 'encodeURIComponent=1&run=Y&step=1&TYPEK=sii&year={1}&isnew=false&co_id={0}&firstin=1&off=1&ifrs=Y'.format(stock.id, period.roc_year)
-            elif table_type == '股利分配':
-                row_xpath = '//table[@class="hasBorder"]//tr'
-                cell_xpath = './*'
-                url = 'http://mops.twse.com.tw/mops/web/ajax_t05st09'
-                data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}'.format(stock.id, period.roc_year)
-            elif table_type == '會計報告':
-                row_xpath = '//table[@class="main_table hasBorder" and contains(., "會計師查核報告")]//tr[position() >= 2]'
-                cell_xpath = './td'
-                url = 'http://mops.twse.com.tw/server-java/t164sb01'
-                data = 'step=1&CO_ID={0}&SYEAR={1}&SSEASON={2}&REPORT_ID=C'.format(stock.id, period.ad_year, period.season.replace("0", ""))
-            else:
-                raise ValueError('table_type值只能是(資產負債表/綜合損益表/權益變動表/現金流量表/財報附註/財務分析/股利分配/會計報告)其中之一')
+        book_path = self._get_book_path(stock, table_type)
+        sheet_name = self._get_sheet_name(period)
+        if refresh or sheet_name not in self._excel.get_sheet_names(book_path):
+            self._fetcher.wait(30, 35)
+            table = self.get_statment_table(table_type, stock, period)
+            self._save_statment_table(self._excel, table_type, stock, period, table)
 
-            records = list()
+    def _save_statment_table(self, excel: ClsExcelHandler, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]), table: List[List[str]]):
+        """
+        工作表不存在或內容變動才寫入Excel檔案,寫入成功後才記錄雜湊值(存檔失敗下次仍會視為變動;空白表格視為尚未申報,只記錄檢查時間)
 
-            html = self._fetcher.download_html(url, 'post', data)
-            rows = self._fetcher.find_elements(html, row_xpath)
+        Arguments:
+        excel -- Excel處理物件
+        table_type -- 表格類型
+        stock -- 股票代碼
+        period -- 年度季別
+        table -- 表格內容
+        """
+        book_path = self._get_book_path(stock, table_type)
+        excel.open_book(book_path)
+
+        sheet_name = self._get_sheet_name(period)
+        if not ClsStatementStore.normalize_records(table):
+            self._get_store().record_empty_table(stock.id, table_type, sheet_name)
+            return
+
+        sheet_existed = excel.is_sheet_existed(sheet_name)
+        if sheet_existed and self._get_store().get_table_hash(stock.id, table_type, sheet_name) is None:
+            excel.open_sheet(sheet_name)
+            self._get_store().record_table(stock.id, stock.name, table_type, sheet_name, excel.get_sheet_values())
+        previous_hash = self._get_store().get_table_hash(stock.id, table_type, sheet_name)
+        changed = self._get_store().get_content_hash(table) != previous_hash
+        if not sheet_existed or changed:
+            excel.open_sheet(sheet_name)
+            if sheet_existed:
+                excel.clear_sheet()
+            excel.write_to_sheet(table)
+            excel.save_book(book_path)
+        if self._get_store().record_table(stock.id, stock.name, table_type, sheet_name, table):
+            self._notify_change(stock, table_type, sheet_name, previous_hash)
+
+    def _notify_change(self, stock: NamedTuple('stock', [('id', str), ('name', str)]), table_type: str, sheet_name: str, previous_hash: str):
+        """
+        已儲存的表格內容變動(重編的財報/基本資料異動)時顯示通知;第1次取得或先前為空白不通知
+        (變動項目可由資料庫的get_changes/get_recent_changes查詢)
 
-            for row in rows:
-                record = list()
-                cells = row.xpath(cell_xpath)
-                for cell in cells:
-                    record.append(''.join(cell.itertext()).strip())
-                records.append(record)
+        Arguments:
+        stock -- 股票代號/名稱
+        table_type -- 表格類型
+        sheet_name -- 工作表名稱(基本資料為空白)
+        previous_hash -- 變動前的雜湊值
+        """
+        if previous_hash is None or previous_hash == ClsStatementStore.get_content_hash([]):
+            return
+        self.notifier.show_toast('Stock Statments', stock.id + '(' + stock.name + ') ' + table_type + (' ' + sheet_name if sheet_name != '' else '') + ' 內容變動', duration=1)
 
-            return records
+    def verify_statment_file(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])) -> bool:
+        """
+        以雜湊值驗證Excel檔案內容與最後取得的內容是否一致(不需下載網頁)
 
-        book_path = self.books_path + '\\' + stock.id + '(' + stock.name + ')_{0}'.format(table_type) + '.xlsx'
-        self._excel.open_book(book_path)
+        Arguments:
+        table_type -- 表格類型(基本資料/資產負債表/綜合損益表/權益變動表/現金流量表/財報附註/財務分析/股利分配/會計報告)
+        stock -- 股票代碼
+        period -- 年度季別(基本資料為None)
 
-        sheet_name = period.ad_year + '_' + period.season
-        if not self._excel.is_sheet_existed(sheet_name):
-            self._fetcher.wait(30, 35)
-            self._excel.open_sheet(sheet_name)
-            table = get_statment_table()
-            self._excel.write_to_sheet(table)
-        self._excel.save_book(book_path)
+        Returns:
+        回傳結果(未記錄雜湊值或檔案/工作表不存在則為False)
+        """
+        book_path = self._get_book_path(stock, table_type)
+        sheet_name = self._get_sheet_name(period) if period is not None else ''
+        content_hash = self._get_store().get_table_hash(stock.id, table_type, sheet_name)
+        if content_hash is None or not self._excel.is_book_existed(book_path):
+            return False
+
+        for source_sheet_name, rows in self._excel.read_book_sheets(book_path):
+            if source_sheet_name == sheet_name or table_type == '基本資料':
+                return self._get_store().get_content_hash(list(rows)) == content_hash
+
+        return False
+
+    def _get_store(self) -> ClsStatementStore:
+        """
+        取得Excel存放路徑下的資料庫(記錄表格內容/雜湊值/歷史快照;分片工作模式由多台主機共用)
+
+        Returns:
+        資料庫
+        """
+        if self._store is None or self._store.database_path != self.books_path + '\\stock_statements.db':
+            self._store = ClsStatementStore(self.books_path + '\\stock_statements.db', self.shared_store)
+        return self._store
+
+    def get_statment_table(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])) -> List[List[str]]:
+        """
+        取得表格內容
+
+        Arguments:
+        table_type -- 表格類型(資產負債表/綜合損益表/權益變動表/現金流量表/財報附註/財務分析/股利分配/會計報告)
+        stock -- 股票代碼
+        period -- 年度季別
+
+        Returns:
+        表格內容
+        """
+        request = self._get_statment_request(table_type, stock, period)
+        html = self._fetcher.download_html(request.url, 'post', request.data)
+        return self._normalize_statment_table(self._parse_statment_table(html, request))
+
+    def _get_statment_request(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])) -> NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)]):
+        request = NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)])
+        if table_type == '資產負債表':
+            request.row_xpath = '//table[@class="hasBorder"]//tr[not(th)]'
+            request.cell_xpath = './td[position() <= 3]'
+            request.url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb03'
+            request.data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
+        elif table_type == '綜合損益表':
+            request.row_xpath = '//table[@class="hasBorder"]//tr[not(th)]'
+            request.cell_xpath = './td[position() <= 3]'
+            request.url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb04'
+            request.data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
+        elif table_type == '現金流量表':
+            request.row_xpath = '//table[@class="hasBorder"]//tr[not(th)]'
+            request.cell_xpath = './td[position() <= 2]'
+            request.url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb05'
+            request.data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
+        elif table_type == '權益變動表':
+            request.row_xpath = '//table[@class="hasBorder" and position() = 2]//tr[position() >=3]'
+            request.cell_xpath = './*'
+            request.url = 'http://mops.twse.com.tw/mops/web/ajax_t164sb06'
+            request.data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}&season={2}'.format(stock.id, period.roc_year, period.season)
+        elif table_type == '財報附註':
+            request.row_xpath = '//table[@class="main_table hasBorder" and contains(., "財報附註")]//tr[position() >= 2]'
+            request.cell_xpath = './td'
+            request.url = 'http://mops.twse.com.tw/server-java/t164sb01'
+            request.data = 'step=1&CO_ID={0}&SYEAR={1}&SSEASON={2}&REPORT_ID=C'.format(stock.id, period.ad_year, period.season.replace("0", ""))
+        elif table_type == '財務分析':
+            request.row_xpath = '//table[@style = "width:90%;"]//tr[position() >= 2]'
+            request.cell_xpath = './th[@style = "text-align:left !important;"] | ./td[position() = 3]'
+            request.url = 'http://mops.twse.com.tw/mops/web/ajax_t05st22'
+            request.data = 'encodeURIComponent=1&run=Y&step=1&TYPEK=sii&year={1}&isnew=false&co_id={0}&firstin=1&off=1&ifrs=Y'.format(stock.id, period.roc_year)
+        elif table_type == '股利分配':
+            request.row_xpath = '//table[@class="hasBorder"]//tr'
+            request.cell_xpath = './*'
+            request.url = 'http://mops.twse.com.tw/mops/web/ajax_t05st09'
+            request.data = 'encodeURIComponent=1&step=1&firstin=1&off=1&keyword4=&code1=&TYPEK2=&checkbtn=&queryName=co_id&inpuType=co_id&TYPEK=all&isnew=false&co_id={0}&year={1}'.format(stock.id, period.roc_year)
+        elif table_type == '會計報告':
+            request.row_xpath = '//table[@class="main_table hasBorder" and contains(., "會計師查核報告")]//tr[position() >= 2]'
+            request.cell_xpath = './td'
+            request.url = 'http://mops.twse.com.tw/server-java/t164sb01'
+            request.data = 'step=1&CO_ID={0}&SYEAR={1}&SSEASON={2}&REPORT_ID=C'.format(stock.id, period.ad_year, period.season.replace("0", ""))
+        else:
+            raise ValueError('table_type值只能是(資產負債表/綜合損益表/權益變動表/現金流量表/財報附註/財務分析/股利分配/會計報告)其中之一')
+        return request
+
+    def _parse_statment_table(self, html: etree.HTML, request: NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)])) -> List[List[str]]:
+        records = list()
+
+        rows = self._fetcher.find_elements(html, request.row_xpath)
+
+        for row in rows:
+            record = list()
+            cells = row.xpath(request.cell_xpath)
+            for cell in cells:
+                record.append(''.join(cell.itertext()))
+            records.append(record)
+
+        return records
+
+    def _normalize_statment_table(self, records: List[List[str]]) -> List[List[str]]:
+        return [[cell.strip() for cell in record] for record in records]
+
+    def get_compact_statment_table(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])) -> ClsStatementTable:
+        """
+        取得精簡表格內容(會計項目共用,數值以array儲存,適合整個巿場載入記憶體分析)
+
+        Arguments:
+        table_type -- 表格類型(資產負債表/綜合損益表/權益變動表/現金流量表/財報附註/財務分析/股利分配/會計報告)
+        stock -- 股票代碼
+        period -- 年度季別
+
+        Returns:
+        精簡表格
+        """
+        return ClsStatementTable.from_records(self.get_statment_table(table_type, stock, period))
+
+    def _get_book_path(self, stock: NamedTuple('stock', [('id', str), ('name', str)]), table_type: str) -> str:
+        return self.books_path + '\\' + stock.id + '(' + stock.name + ')_{0}'.format(table_type) + '.xlsx'
+
+    def _get_sheet_name(self, period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])) -> str:
+        return period.ad_year + '_' + period.season
 
     def _to_list(self, source: Union[dict, etree.Element]) -> List[List[str]]:
         result = list()
@@ -246,12 +560,12 @@ class ClsTaiwanStock():
 
         return result
 
-    def show_config_form(self) -> NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str)]):
+    def show_config_form(self) -> NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str), ('sync_mode', bool), ('watchlist', str), ('time_budget_minutes', str)]):
         """
         開啟設定介面
 
         Returns:
-        設定結果(執行動作+磁碟代號+目錄名稱+前n季)
+        設定結果(執行動作+磁碟代號+目錄名稱+前n季+增量同步+優先股票代碼+執行時間上限)
         """
         form = gui.FlexForm('設定台股上巿股票Excel存放路徑')
         layout = [
@@ -262,6 +576,9 @@ class ClsTaiwanStock():
             [gui.Text('請輸入結束股票代碼(未輸入=不限)')], [gui.Text('代碼', size=(15, 1), key='FinishStockId'), gui.InputText('')],
             [gui.Text('請輸入起始季數(未輸入=不限)')], [gui.Text('季數', size=(15, 1), key='StartSeason'), gui.InputText('1')],
             [gui.Text('請輸入結束季數(未輸入=不限)')], [gui.Text('季數', size=(15, 1), key='FinishSeason'), gui.InputText('1')],
+            [gui.Checkbox('增量同步(只取得缺少的資料,忽略季數設定)')],
+            [gui.Text('請輸入優先取得的股票代碼(以逗號分隔,未輸入=無)')], [gui.Text('代碼', size=(15, 1), key='Watchlist'), gui.InputText('')],
+            [gui.Text('請輸入執行時間上限(分鐘,未輸入=不限)')], [gui.Text('分鐘', size=(15, 1), key='TimeBudget'), gui.InputText('')],
             [gui.Submit(), gui.Cancel()]
             ]
         window = form.Layout(layout)
@@ -269,7 +586,7 @@ class ClsTaiwanStock():
 
         window.Close()
 
-        result = NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str)])
+        result = NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str), ('sync_mode', bool), ('watchlist', str), ('time_budget_minutes', str)])
         result.action = return_values[0]
         result.drive_letter = return_values[1][0]
         result.directory_name = return_values[1][1]
@@ -277,6 +594,9 @@ class ClsTaiwanStock():
         result.finish_stock_id = return_values[1][3]
         result.start_season = return_values[1][4]
         result.finish_season = return_values[1][5]
+        result.sync_mode = return_values[1][6]
+        result.watchlist = return_values[1][7]
+        result.time_budget_minutes = return_values[1][8]
 
         return result
 
@@ -290,31 +610,57 @@ class ClsTaiwanStock():
         gui.Popup(message)
         pass
 
-    def get_stock_files(self, config: NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str)])):
+    def get_stock_files(self, config: NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str), ('sync_mode', bool), ('watchlist', str), ('time_budget_minutes', str)])):
         stock_list = self.get_stock_list(config.start_stock_id, config.finish_stock_id)
-        stock_count = len(stock_list)
         periods = self._get_periods(config.start_season, config.finish_season)
-        period_count = len(periods)
-        roc_years = self._get_roc_years(periods)
-        roc_year_count = len(roc_years)
-        self._total_process_count = stock_count + (stock_count * roc_year_count) + (stock_count * period_count * 7)
+        roc_years = list()
+        for roc_year in self._get_roc_years(periods):
+            if roc_year not in roc_years:
+                roc_years.append(roc_year)
 
+        jobs = list()
         for stock in stock_list:
-            self.get_basic_info_files(stock)
+            jobs.append(self.to_job('基本資料', stock, None, False))
             for roc_year in roc_years:
-                self.get_analysis_file(stock, roc_year)
+                jobs.append(self.to_job('財務分析', stock, self.to_period(str(int(roc_year) + 1911), '00'), False))
                 for period in periods:
                     if (roc_year == period.roc_year):
-                        self.get_statment_files(stock, period)
+                        for table_type in self.statment_table_types:
+                            jobs.append(self.to_job(table_type, stock, period, False))
+
+        self.run_jobs(jobs, config)
+
+    def run_jobs(self, jobs: List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])], config: NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str), ('sync_mode', bool), ('watchlist', str), ('time_budget_minutes', str)]) = None, stop_event: threading.Event = None):
+        """
+        依排程器權重執行工作(優先股票/核心報表/最新季別先取得),超過執行時間上限即停止;
+        有設定pipeline時改以管線執行(下載/解析/寫入同時進行)
+
+        Arguments:
+        jobs -- 工作列表
+
+        Keyword Arguments:
+        config -- 設定結果(使用優先股票代碼/執行時間上限) (default: None)
+        stop_event -- 設定後停止執行剩餘工作 (default: None)
+        """
+        time_budget_seconds = 0
+        if config is not None:
+            self.scheduler.watchlist = set(stock_id.strip() for stock_id in config.watchlist.split(',') if stock_id.strip() != '')
+            time_budget_seconds = float(config.time_budget_minutes) * 60 if config.time_budget_minutes != '' else 0
+
+        if self.pipeline is not None:
+            self.pipeline.run(jobs, time_budget_seconds, stop_event)
+            return
+
+        self.reset_progress(len(jobs))
+
+        for job in self.scheduler.iter_jobs(jobs, time_budget_seconds):
+            if stop_event is not None and stop_event.is_set():
+                break
+            self._run_job(job)
 
     def get_statment_files(self, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])):
-        self.get_statment_file('資產負債表', stock, period)
-        self.get_statment_file('綜合損益表', stock, period)
-        self.get_statment_file('現金流量表', stock, period)
-        self.get_statment_file('權益變動表', stock, period)
-        self.get_statment_file('財報附註', stock, period)
-        self.get_statment_file('股利分配', stock, period)
-        self.get_statment_file('會計報告', stock, period)
+        for table_type in self.statment_table_types:
+            self.get_statment_file(table_type, stock, period)
 
     def _get_roc_years(self, periods: List[NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])]):
         years = list()
@@ -330,3 +676,310 @@ class ClsTaiwanStock():
         period.ad_year = str(int(roc_year) + 1911)
         period.season = "00"
         self.get_statment_file('財務分析', stock, period)
+
+    def sync_stock_files(self, config: NamedTuple('result', [('action', str), ('drive_letter', str), ('directory_name', str), ('start_stock_id', str), ('finish_stock_id', str), ('start_season', str), ('finish_season', str), ('sync_mode', bool), ('watchlist', str), ('time_budget_minutes', str)]), revisit_days: int = 14):
+        """
+        增量同步: 只取得尚未儲存的(股票,年度季別,表格)組合,並於申報期限後重新檢查近期資料
+
+        Arguments:
+        config -- 設定結果(只使用起始/結束股票代碼)
+
+        Keyword Arguments:
+        revisit_days -- 申報期限後天數 (default: 14)
+        """
+        stock_list = self.get_stock_list(config.start_stock_id, config.finish_stock_id)
+        periods = self._get_periods('', '')
+        revisit_periods = self._get_revisit_periods(revisit_days)
+
+        jobs = self._get_sync_jobs(stock_list, periods, revisit_periods)
+        self.run_jobs(jobs, config)
+
+    def run_worker(self, coordinator: ClsCrawlCoordinator, worker_id: str, shard_size: int = 50, lease_seconds: int = 900, revisit_days: int = 14):
+        """
+        分片工作模式: 向協調者認領當日的股票代號分片並以增量同步處理,直到所有分片完成
+
+        Arguments:
+        coordinator -- 分片協調者(多個工作程序共用)
+        worker_id -- 工作程序代號
+
+        Keyword Arguments:
+        shard_size -- 每個分片的股票數量 (default: 50)
+        lease_seconds -- 分片租約秒數,超過未更新視為工作程序停止並重新指派 (default: 900)
+        revisit_days -- 申報期限後天數 (default: 14)
+        """
+        self.shared_store = True
+        self.open_books_directory(self.books_path)
+        stock_list = self.get_stock_list('', '')
+        run_id = datetime.date.today().isoformat()
+        coordinator.create_shards([stock.id for stock in stock_list], shard_size, run_id)
+        periods = self._get_periods('', '')
+        revisit_periods = self._get_revisit_periods(revisit_days)
+
+        while True:
+            shard = coordinator.claim_shard(worker_id, lease_seconds, run_id)
+            if shard is None:
+                if coordinator.is_finished(run_id):
+                    break
+                threading.Event().wait(lease_seconds / 3)
+                continue
+
+            lease_lost = threading.Event()
+            shard_finished = threading.Event()
+
+            def send_heartbeat():
+                while not shard_finished.wait(lease_seconds / 3):
+                    if not coordinator.heartbeat(shard.shard_id, worker_id, lease_seconds):
+                        lease_lost.set()
+                        break
+
+            heartbeat_thread = threading.Thread(target=send_heartbeat, daemon=True)
+            heartbeat_thread.start()
+
+            try:
+                shard_stock_list = [stock for stock in stock_list if coordinator.is_in_shard(shard, stock.id)]
+                jobs = self._get_sync_jobs(shard_stock_list, periods, revisit_periods)
+                self.run_jobs(jobs, stop_event=lease_lost)
+            finally:
+                shard_finished.set()
+                heartbeat_thread.join()
+
+            if not lease_lost.is_set():
+                coordinator.complete_shard(shard.shard_id, worker_id)
+
+    def _get_sync_jobs(self, stock_list: List[NamedTuple('stock', [('id', str), ('name', str)])], periods: List[NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])], revisit_periods: List[NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)])]) -> List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])]:
+        """
+        比對已儲存的工作表及檢查時間,產生需要取得的工作列表:
+        未儲存(或空白)且申報期限後未檢查過的表格;申報期限後n天內,未儲存或申報期限前取得的表格
+
+        Arguments:
+        stock_list -- 股票代號/名稱列表
+        periods -- 目前可取得的年度季別列表
+        revisit_periods -- 需要重新檢查的年度季別列表
+
+        Returns:
+        工作列表(表格類型+股票+年度季別+是否重新取得)
+        """
+        empty_hash = ClsStatementStore.get_content_hash([])
+        revisit_sheet_names = set(self._get_sheet_name(period) for period in revisit_periods)
+        revisit_roc_years = set(period.roc_year for period in revisit_periods)
+        all_periods = list(periods)
+        period_sheet_names = set(self._get_sheet_name(period) for period in periods)
+        for period in revisit_periods:
+            if self._get_sheet_name(period) not in period_sheet_names:
+                all_periods.append(period)
+        roc_years = list()
+        for roc_year in self._get_roc_years(all_periods):
+            if roc_year not in roc_years:
+                roc_years.append(roc_year)
+
+        def check_table(table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]), sheet_names: List[str], table_checks: dict, revisit: bool):
+            sheet_name = self._get_sheet_name(period)
+            content_hash, checked_at = table_checks.get(sheet_name, (None, None))
+            stored = sheet_name in sheet_names and content_hash != empty_hash
+            checked = checked_at is not None and checked_at >= self._get_period_deadline(period).isoformat(timespec='seconds')
+            if (stored and revisit and not checked) or (not stored and (revisit or not checked)):
+                return self.to_job(table_type, stock, period, sheet_name in sheet_names)
+            return None
+
+        jobs = list()
+
+        for stock in stock_list:
+            if not self._excel.is_book_existed(self._get_book_path(stock, '基本資料')):
+                jobs.append(self.to_job('基本資料', stock, None, False))
+
+            analysis_sheet_names = self._excel.get_sheet_names(self._get_book_path(stock, '財務分析'))
+            analysis_checks = self._get_legacy_checked_tables(stock, '財務分析', analysis_sheet_names)
+            for roc_year in roc_years:
+                period = self.to_period(str(int(roc_year) + 1911), '00')
+                jobs.append(check_table('財務分析', stock, period, analysis_sheet_names, analysis_checks, roc_year in revisit_roc_years))
+
+            for table_type in self.statment_table_types:
+                sheet_names = self._excel.get_sheet_names(self._get_book_path(stock, table_type))
+                table_checks = self._get_legacy_checked_tables(stock, table_type, sheet_names)
+                for period in all_periods:
+                    jobs.append(check_table(table_type, stock, period, sheet_names, table_checks, self._get_sheet_name(period) in revisit_sheet_names))
+
+        return [job for job in jobs if job is not None]
+
+    def _get_legacy_checked_tables(self, stock: NamedTuple('stock', [('id', str), ('name', str)]), table_type: str, sheet_names: List[str]) -> dict:
+        """
+        取得已記錄表格的雜湊值及最後檢查時間;未記錄雜湊值的工作表(舊版本取得,可能是未申報時建立的空白工作表)
+        讀取內容記錄1次,檢查時間記為未檢查,之後依申報期限規則重新取得
+
+        Arguments:
+        stock -- 股票代號/名稱
+        table_type -- 表格類型
+        sheet_names -- Excel檔案的工作表名稱
+
+        Returns:
+        工作表名稱/(雜湊值,檢查時間)對照
+        """
+        table_checks = self._get_store().get_table_checks(stock.id, table_type)
+        if all(sheet_name in table_checks for sheet_name in sheet_names if ClsStatementExporter.sheet_name_pattern.match(sheet_name)):
+            return table_checks
+
+        for sheet_name, rows in self._excel.read_book_sheets(self._get_book_path(stock, table_type)):
+            if sheet_name in table_checks or not ClsStatementExporter.sheet_name_pattern.match(sheet_name):
+                continue
+            table = [list(row) for row in rows]
+            if ClsStatementStore.normalize_records(table):
+                self._get_store().record_table(stock.id, stock.name, table_type, sheet_name, table, checked_at='')
+            else:
+                self._get_store().record_empty_table(stock.id, table_type, sheet_name, checked_at='')
+
+        return self._get_store().get_table_checks(stock.id, table_type)
+
+    def get_refresh_jobs(self, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]) = None) -> List[NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])]:
+        """
+        產生重新取得單一股票資料的工作列表(ex: 申報/更正財報,變更基本資料)
+
+        Arguments:
+        stock -- 股票代號/名稱
+
+        Keyword Arguments:
+        period -- 年度季別(None=基本資料;指定時為所有財務報表及該年度的財務分析) (default: None)
+
+        Returns:
+        工作列表
+        """
+        if period is None:
+            return [self.to_job('基本資料', stock, None, True)]
+
+        jobs = [self.to_job(table_type, stock, period, True) for table_type in self.statment_table_types]
+        jobs.append(self.to_job('財務分析', stock, self.to_period(period.ad_year, '00'), True))
+        return jobs
+
+    def to_job(self, table_type: str, stock: NamedTuple('stock', [('id', str), ('name', str)]), period: NamedTuple('period', [('roc_year', str), ('ad_year', str), ('season', str)]), refresh: bool) -> NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)]):
+        """
+        建立工作
+
+        Arguments:
+        table_type -- 表格類型
+        stock -- 股票代號/名稱
+        period -- 年度季別(基本資料為None)
+        refresh -- 工作表已存在時是否重新取得
+
+        Returns:
+        工作(表格類型+股票+年度季別+是否重新取得)
+        """
+        job = NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])
+        job.table_type = table_type
+        job.stock = stock
+        job.period = period
+        job.refresh = refresh
+        return job
+
+    def _run_job(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])):
+        if job.table_type == '基本資料':
+            self.get_basic_info_files(job.stock, job.refresh)
+        else:
+            self.get_statment_file(job.table_type, job.stock, job.period, job.refresh)
+
+    def is_job_stored(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)]), sheet_names_cache: dict = None) -> bool:
+        """
+        判斷工作的表格是否已儲存(基本資料=檔案存在;其他=工作表存在)
+
+        Arguments:
+        job -- 工作
+
+        Keyword Arguments:
+        sheet_names_cache -- 活頁簿路徑/工作表名稱對照(同一批工作共用,避免重複開啟活頁簿) (default: None)
+
+        Returns:
+        回傳結果
+        """
+        book_path = self._get_book_path(job.stock, job.table_type)
+        if job.table_type == '基本資料':
+            return self._excel.is_book_existed(book_path)
+
+        sheet_names_cache = sheet_names_cache if sheet_names_cache is not None else dict()
+        if book_path not in sheet_names_cache:
+            sheet_names_cache[book_path] = set(self._excel.get_sheet_names(book_path))
+        return self._get_sheet_name(job.period) in sheet_names_cache[book_path]
+
+    def get_job_request(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)])) -> NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)]):
+        """
+        取得工作的網頁要求(網址/附加資料/列及儲存格XPATH)
+
+        Arguments:
+        job -- 工作
+
+        Returns:
+        網頁要求
+        """
+        if job.table_type == '基本資料':
+            return self._get_basic_info_request(job.stock)
+        return self._get_statment_request(job.table_type, job.stock, job.period)
+
+    def download_request(self, request: NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)])) -> str:
+        """
+        下載網頁要求的內容(不暫停,由呼叫端控制下載間隔)
+
+        Arguments:
+        request -- 網頁要求
+
+        Returns:
+        網頁內容
+        """
+        return self._fetcher.download_text(request.url, 'post', request.data)
+
+    def parse_job_table(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)]), request: NamedTuple('request', [('url', str), ('data', str), ('row_xpath', str), ('cell_xpath', str)]), text: str) -> List[List[str]]:
+        """
+        解析下載的網頁內容
+
+        Arguments:
+        job -- 工作
+        request -- 網頁要求
+        text -- 網頁內容
+
+        Returns:
+        表格內容
+        """
+        html = etree.HTML(text)
+        if job.table_type == '基本資料':
+            return self._parse_basic_info(html, request)
+        return self._parse_statment_table(html, request)
+
+    def normalize_job_table(self, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)]), table: List[List[str]]) -> List[List[str]]:
+        """
+        正規化表格內容(去除儲存格前後空白)
+
+        Arguments:
+        job -- 工作
+        table -- 表格內容
+
+        Returns:
+        表格內容
+        """
+        return self._normalize_statment_table(table)
+
+    def save_job_table(self, excel: ClsExcelHandler, job: NamedTuple('job', [('table_type', str), ('stock', NamedTuple), ('period', NamedTuple), ('refresh', bool)]), table: List[List[str]]):
+        """
+        儲存工作的表格內容(內容變動才寫入Excel檔案),並增加完成進度
+
+        Arguments:
+        excel -- Excel處理物件(多執行緒時由寫入的執行緒各自建立)
+        job -- 工作
+        table -- 表格內容
+        """
+        if job.table_type == '基本資料':
+            self._save_basic_info(excel, job.stock, table)
+        else:
+            self._save_statment_table(excel, job.table_type, job.stock, job.period, table)
+        self.add_progress()
+
+    def reset_progress(self, total_count: int):
+        """
+        重設完成進度
+
+        Arguments:
+        total_count -- 工作總數
+        """
+        self._current_process_count = 0
+        self._total_process_count = total_count
+
+    def add_progress(self):
+        """
+        增加1個已完成的工作
+        """
+        self._current_process_count += 1
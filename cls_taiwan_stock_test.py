@@ -133,6 +133,83 @@ class ClsTaiwanStockTest(unittest.TestCase):
         stock_list = self.taiwan_stock.get_stock_list('1101')
         self.assertTrue(len(stock_list) == 1 and stock_list[0].id == '1101')
 
+    def test_get_sync_jobs(self):
+        stock = self.stock_list[0]
+        period = self.taiwan_stock.to_period('2016', '01')
+        with self.taiwan_stock._get_store().connection as connection:
+            connection.execute('DELETE FROM table_hashes WHERE stock_id = ? AND sheet_name = ?', (stock.id, '2016_01'))
+
+        jobs = self.taiwan_stock._get_sync_jobs([stock], [period], [])
+        self.assertEqual(jobs[0].table_type, '基本資料')
+        self.assertEqual([job.refresh for job in jobs if job.table_type == '資產負債表'], [False])
+
+        self.taiwan_stock._save_statment_table(self.excel_handler, '資產負債表', stock, period, [[' ', '']])
+        self.assertNotIn('2016_01', self.excel_handler.get_sheet_names(self.taiwan_stock._get_book_path(stock, '資產負債表')))
+        jobs = self.taiwan_stock._get_sync_jobs([stock], [period], [])
+        self.assertFalse([job for job in jobs if job.table_type == '資產負債表'])
+        jobs = self.taiwan_stock._get_sync_jobs([stock], [period], [period])
+        self.assertEqual([job.refresh for job in jobs if job.table_type == '資產負債表'], [False])
+
+        self.taiwan_stock._save_statment_table(self.excel_handler, '資產負債表', stock, period, [['資產總額', '1,000']])
+        jobs = self.taiwan_stock._get_sync_jobs([stock], [period], [period])
+        self.assertFalse([job for job in jobs if job.table_type == '資產負債表'])
+
+    def test_get_sync_jobs_legacy_sheet(self):
+        stock = self.stock_list[0]
+        period = self.taiwan_stock.to_period('2016', '03')
+        with self.taiwan_stock._get_store().connection as connection:
+            connection.execute('DELETE FROM table_hashes WHERE stock_id = ? AND sheet_name = ?', (stock.id, '2016_03'))
+        book_path = self.taiwan_stock._get_book_path(stock, '資產負債表')
+        self.excel_handler.open_book(book_path)
+        self.excel_handler.open_sheet('2016_03')
+        self.excel_handler.save_book(book_path)
+
+        jobs = self.taiwan_stock._get_sync_jobs([stock], [period], [])
+        self.assertEqual([job.refresh for job in jobs if job.table_type == '資產負債表'], [True])
+        self.assertEqual(self.taiwan_stock._get_store().get_table_checks(stock.id, '資產負債表')['2016_03'][1], '')
+
+        self.taiwan_stock._save_statment_table(self.excel_handler, '資產負債表', stock, period, [])
+        jobs = self.taiwan_stock._get_sync_jobs([stock], [period], [])
+        self.assertFalse([job for job in jobs if job.table_type == '資產負債表'])
+
+    def test_save_statment_table_failed(self):
+        stock = self.stock_list[0]
+        period = self.taiwan_stock.to_period('2016', '02')
+        with self.taiwan_stock._get_store().connection as connection:
+            connection.execute('DELETE FROM table_hashes WHERE stock_id = ? AND sheet_name = ?', (stock.id, '2016_02'))
+
+        class FailedExcelHandler(ClsExcelHandler):
+            def save_book(self, book_path: str):
+                raise PermissionError(book_path)
+
+        with self.assertRaises(PermissionError):
+            self.taiwan_stock._save_statment_table(FailedExcelHandler(), '資產負債表', stock, period, [['資產總額', '1,000']])
+        self.assertIsNone(self.taiwan_stock._get_store().get_table_hash(stock.id, '資產負債表', '2016_02'))
+
+        self.taiwan_stock._save_statment_table(self.excel_handler, '資產負債表', stock, period, [['資產總額', '1,000']])
+        self.assertIn('2016_02', self.excel_handler.get_sheet_names(self.taiwan_stock._get_book_path(stock, '資產負債表')))
+        self.assertIsNotNone(self.taiwan_stock._get_store().get_table_hash(stock.id, '資產負債表', '2016_02'))
+
+    def test_save_statment_table_changed(self):
+        stock = self.stock_list[0]
+        period = self.taiwan_stock.to_period('2016', '04')
+        with self.taiwan_stock._get_store().connection as connection:
+            connection.execute('DELETE FROM table_hashes WHERE stock_id = ? AND sheet_name = ?', (stock.id, '2016_04'))
+
+        messages = list()
+        notifier = self.taiwan_stock.notifier
+        self.taiwan_stock.notifier = typing.NamedTuple('notifier', [('show_toast', typing.Callable)])
+        self.taiwan_stock.notifier.show_toast = lambda title, message, duration: messages.append(message)
+        try:
+            self.taiwan_stock._save_statment_table(self.excel_handler, '綜合損益表', stock, period, [])
+            self.taiwan_stock._save_statment_table(self.excel_handler, '綜合損益表', stock, period, [['營業收入', '100']])
+            self.taiwan_stock._save_statment_table(self.excel_handler, '綜合損益表', stock, period, [['營業收入', '100']])
+            self.assertEqual(messages, [])
+            self.taiwan_stock._save_statment_table(self.excel_handler, '綜合損益表', stock, period, [['營業收入', '90']])
+            self.assertEqual(messages, ['1101(台泥) 綜合損益表 2016_04 內容變動'])
+        finally:
+            self.taiwan_stock.notifier = notifier
+
     def test_get_statment_files_會計報告(self):
         stock = typing.NamedTuple('stock', [('id', str), ('name', str)])
         stock.id = '1213'
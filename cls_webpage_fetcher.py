@@ -4,6 +4,7 @@ from retry import retry
 import time
 import random
 from typing import List
+from typing import NamedTuple
 
 
 class ClsWebpageFetcher():
@@ -11,16 +12,35 @@ class ClsWebpageFetcher():
         pass
 
     @retry(tries=3, delay=600, backoff=2)
-    def _get_response(self, url: str, method: str, data: str) -> requests.Response:
+    def _get_response(self, url: str, method: str, data: str = None, headers: dict = None) -> requests.Response:
         """
-        取得瀏覽器回應
+        取得瀏覽器回應(失敗時等待10分鐘後重試,最多3次)
 
         Arguments:
         url -- 網址
         method -- get/post/download
 
         Keyword Arguments:
-        data -- 附加資料
+        data -- 附加資料 (default: None)
+        headers -- 額外的要求標頭 (default: None)
+
+        Returns:
+        瀏覽器回應
+        """
+        return self._get_response_once(url, method, data, headers)
+
+    def _get_response_once(self, url: str, method: str, data: str = None, headers: dict = None, timeout: float = None) -> requests.Response:
+        """
+        取得瀏覽器回應(不重試)
+
+        Arguments:
+        url -- 網址
+        method -- get/post/download
+
+        Keyword Arguments:
+        data -- 附加資料 (default: None)
+        headers -- 額外的要求標頭 (default: None)
+        timeout -- 連線/讀取逾時秒數(None=不限) (default: None)
 
         Returns:
         瀏覽器回應
@@ -31,21 +51,22 @@ class ClsWebpageFetcher():
                 'user-agent':
                 'Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/67.0.3396.99 Safari/537.36'
             }
+            browser_headers.update(headers or dict())
             return browser_headers
 
         session = requests.session()
         session.keep_alive = False
 
         if method == 'get':
-            response = session.get(url, params=data, headers=get_browser_headers(), verify=False)
+            response = session.get(url, params=data, headers=get_browser_headers(), verify=False, timeout=timeout)
             response.encoding = response.apparent_encoding
             return response
         elif method == 'post':
-            response = session.post(url, data=data, headers=get_browser_headers(), verify=False)
+            response = session.post(url, data=data, headers=get_browser_headers(), verify=False, timeout=timeout)
             response.encoding = response.apparent_encoding
             return response
         elif method == 'download':
-            response = requests.get(url, headers=get_browser_headers(), verify=False, stream=True)
+            response = requests.get(url, headers=get_browser_headers(), verify=False, stream=True, timeout=timeout)
             return response
         else:
             raise ValueError('method值只能是(get/post/download)其中之一')
@@ -122,5 +143,58 @@ class ClsWebpageFetcher():
         Returns:
         網頁Html
         """
+        return etree.HTML(self.download_text(url, method, data))
+
+    def download_text(self, url: str, method: str = 'get', data: str = None) -> str:
+        """
+        下載網頁內容(不解析,供管線的下載/解析階段分開執行)
+
+        Arguments:
+        url -- 網址
+        method -- get/post (default: 'get')
+
+        Keyword Arguments:
+        data -- 附加資料 (default: None)
+
+        Returns:
+        網頁內容
+        """
         response = self._get_response(url, method, data)
-        return etree.HTML(response.text)
+        return response.text
+
+    def download_conditional(self, url: str, etag: str = '', last_modified: str = '', timeout: float = None) -> NamedTuple('response', [('not_modified', bool), ('text', str), ('etag', str), ('last_modified', str)]):
+        """
+        條件式下載網頁內容(帶If-None-Match/If-Modified-Since標頭,伺服器回應304表示內容未變動)
+
+        Arguments:
+        url -- 網址
+
+        Keyword Arguments:
+        etag -- 上次回應的ETag (default: '')
+        last_modified -- 上次回應的Last-Modified (default: '')
+        timeout -- 逾時秒數,指定時只嘗試1次(呼叫端有舊資料可沿用時使用);None=失敗時等待後重試 (default: None)
+
+        Returns:
+        (是否未變動, 網頁內容(未變動則為空白), ETag, Last-Modified)
+
+        Raises:
+        requests.HTTPError -- 回應不是2xx/304(ex: 維護頁面/伺服器錯誤)
+        """
+        headers = dict()
+        if etag != '':
+            headers['If-None-Match'] = etag
+        if last_modified != '':
+            headers['If-Modified-Since'] = last_modified
+        if timeout is None:
+            response = self._get_response(url, 'get', None, headers)
+        else:
+            response = self._get_response_once(url, 'get', None, headers, timeout)
+        if response.status_code != 304 and not 200 <= response.status_code < 300:
+            raise requests.HTTPError('HTTP ' + str(response.status_code) + ': ' + url, response=response)
+
+        result = NamedTuple('response', [('not_modified', bool), ('text', str), ('etag', str), ('last_modified', str)])
+        result.not_modified = response.status_code == 304
+        result.text = response.text if not result.not_modified else ''
+        result.etag = response.headers.get('ETag', etag)
+        result.last_modified = response.headers.get('Last-Modified', last_modified)
+        return result
@@ -1,6 +1,72 @@
 import cls_taiwan_stock
+import cls_filing_watcher
+import cls_crawl_coordinator
+import cls_statement_exporter
+import cls_statement_store
+import cls_archive_importer
+import cls_derived_metrics
+import cls_statement_server
+import cls_crawl_pipeline
+import argparse
+import socket
+import os
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('books_path', nargs='?', default='', help='Excel存放路徑(未輸入=開啟設定介面)')
+    parser.add_argument('--watch', action='store_true', help='定期檢查即時重大訊息並重新取得相關資料')
+    parser.add_argument('--worker', default='', metavar='COORDINATOR_PATH', help='分片工作模式,指定共用的協調者資料庫路徑')
+    parser.add_argument('--export-table', default='', metavar='TABLE_TYPE', help='由已儲存資料匯出單一表格類型的全市場活頁簿')
+    parser.add_argument('--export-period', default='', metavar='SHEET_NAME', help='由已儲存資料匯出單一年度季別(ex: 2018_03)的全市場活頁簿')
+    parser.add_argument('--import-archive', action='store_true', help='將已儲存的Excel檔案匯入資料庫(stock_statements.db)')
+    parser.add_argument('--derive-metrics', action='store_true', help='重新計算資料庫中新增或變動的單季/近四季/季增率/年增率')
+    parser.add_argument('--changes', default='', metavar='SINCE', help='列出資料庫中此日期(ex: 2018-11-01)之後內容變動的表格')
+    parser.add_argument('--serve', type=int, default=0, metavar='PORT', help='啟動本機HTTP/JSON查詢服務')
+    parser.add_argument('--watchlist', default='', help='優先取得的股票代碼(以逗號分隔)')
+    parser.add_argument('--time-budget', default='', metavar='MINUTES', help='增量同步的執行時間上限(分鐘)')
+    parser.add_argument('--pipeline', type=int, default=0, metavar='PARSE_WORKERS', help='以管線執行(下載/解析/寫入同時進行),指定解析執行緒數')
+    parser.add_argument('--worker-id', default=socket.gethostname() + '-' + str(os.getpid()), help='工作程序代號')
+    args = parser.parse_args()
+
     taiwan_stock = cls_taiwan_stock.ClsTaiwanStock()
-    taiwan_stock.main()
+    taiwan_stock.scheduler.watchlist = set(stock_id.strip() for stock_id in args.watchlist.split(',') if stock_id.strip() != '')
+    if args.pipeline > 0:
+        taiwan_stock.pipeline = cls_crawl_pipeline.ClsCrawlPipeline(taiwan_stock, parse_workers=args.pipeline)
+    if args.books_path == '':
+        taiwan_stock.main()
+    elif args.watch:
+        taiwan_stock.books_path = args.books_path
+        filing_watcher = cls_filing_watcher.ClsFilingWatcher(taiwan_stock)
+        filing_watcher.watch()
+    elif args.export_table != '':
+        statement_exporter = cls_statement_exporter.ClsStatementExporter(args.books_path)
+        statement_exporter.export_table_book(args.export_table, args.books_path + '\\全市場_' + args.export_table + '.xlsx')
+    elif args.export_period != '':
+        statement_exporter = cls_statement_exporter.ClsStatementExporter(args.books_path)
+        statement_exporter.export_period_book(args.export_period, args.books_path + '\\全市場_' + args.export_period + '.xlsx')
+    elif args.import_archive:
+        statement_store = cls_statement_store.ClsStatementStore(args.books_path + '\\stock_statements.db')
+        archive_importer = cls_archive_importer.ClsArchiveImporter(args.books_path, statement_store)
+        print('匯入表格數量: ' + str(archive_importer.import_archive()))
+        statement_store.close()
+    elif args.derive_metrics:
+        statement_store = cls_statement_store.ClsStatementStore(args.books_path + '\\stock_statements.db')
+        derived_metrics = cls_derived_metrics.ClsDerivedMetrics(statement_store)
+        print('重新計算表格數量: ' + str(derived_metrics.refresh()))
+        statement_store.close()
+    elif args.changes != '':
+        statement_store = cls_statement_store.ClsStatementStore(args.books_path + '\\stock_statements.db')
+        for recorded_at, stock_id, table_type, sheet_name in statement_store.get_recent_changes(args.changes):
+            print(recorded_at + ' ' + stock_id + ' ' + table_type + ' ' + sheet_name)
+        statement_store.close()
+    elif args.serve != 0:
+        statement_store = cls_statement_store.ClsStatementStore(args.books_path + '\\stock_statements.db')
+        statement_server = cls_statement_server.ClsStatementServer(statement_store)
+        statement_server.serve('127.0.0.1', args.serve).serve_forever()
+    elif args.worker != '':
+        taiwan_stock.books_path = args.books_path
+        coordinator = cls_crawl_coordinator.ClsCrawlCoordinator(args.worker)
+        taiwan_stock.run_worker(coordinator, args.worker_id)
+    else:
+        taiwan_stock.sync(args.books_path, args.time_budget)